@@ -26,7 +26,8 @@ CRC algorithms implemented in Python.
 If you want to study the Python implementation of the CRC routines, then this
 is a good place to start from.
 
-The algorithms Bit by Bit, Bit by Bit Fast and Table-Driven are implemented.
+The algorithms Bit by Bit, Bit by Bit Fast, Table-Driven and Folding are
+implemented.
 
 This module can also be used as a library from within Python.
 
@@ -43,8 +44,208 @@ This is an example use of the different algorithms:
     print("{0:#x}".format(crc.bit_by_bit("123456789")))
     print("{0:#x}".format(crc.bit_by_bit_fast("123456789")))
     print("{0:#x}".format(crc.table_driven("123456789")))
+    print("{0:#x}".format(crc.folding("123456789")))
+
+The CRC of a data stream can be calculated incrementally with a hashlib-like
+object:
+
+    h = crc.new()
+    h.update(b"1234")
+    h.update(b"56789")
+    print(h.hexdigest())
+
+The CRCs of many messages can be calculated at once; this is vectorised if
+numpy is installed:
+
+    crcs = crc.table_driven_batch([b"123456789", b"abc", b"defghi"])
+
+The CRC tables are cached and shared by all Crc objects with the same
+parameters; see table_cache_info() and table_cache_clear().
 """
 
+import array
+import functools
+import struct
+import sys
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """
+    Return the numpy module, or None if it is not installed.
+    numpy is only imported when it is first needed, as importing it takes
+    longer than the start-up of pycrc itself.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _reflect_bitwise(data, width):
+    """
+    reflect a data word, i.e. reverts the bit order, one bit at a time.
+    """
+    res = data & 0x01
+    for dummy_i in range(width - 1):
+        data >>= 1
+        res = (res << 1) | (data & 0x01)
+    return res
+
+
+# _REFLECTED_OCTETS[i] is the octet i with the bit order reversed; it can be
+# used as translation table for bytes.translate().
+_REFLECTED_OCTETS = bytes(_reflect_bitwise(i, 8) for i in range(256))
+
+
+def _reflect(data, width):
+    """
+    reflect a data word, i.e. reverts the bit order.
+    The word is reflected a byte at a time: the byte order is reversed and
+    every byte is reflected with a table lookup. The result is then shifted
+    right by the number of padding bits.
+    """
+    num_bytes = (width + 7) // 8
+    data &= (1 << width) - 1
+    res = int.from_bytes(data.to_bytes(num_bytes, 'little').translate(_REFLECTED_OCTETS), 'big')
+    return res >> (8 * num_bytes - width)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_table(width, poly, reflect_in, tbl_idx_width, slice_by):
+    """
+    Generate the CRC tables for the table_driven CRC algorithm.
+    The tables depend only on the arguments, so they are cached and shared by
+    all Crc objects with the same parameters. Tuples are used to make sure
+    the shared tables are not modified.
+    """
+    # pylint: disable=too-many-arguments
+    if tbl_idx_width == 16:
+        # The entry for a 16-bit index is the CRC of its two octets, which is
+        # faster to combine from the slice-by-2 tables than to compute bitwise.
+        tbl0, tbl1 = _cached_table(width, poly, reflect_in, 8, 2)
+        if reflect_in:
+            return (tuple(tbl1[i & 0xff] ^ tbl0[i >> 8] for i in range(1 << 16)),)
+        return (tuple(tbl1[i >> 8] ^ tbl0[i & 0xff] for i in range(1 << 16)),)
+
+    msb_mask = 0x1 << (width - 1)
+    mask = ((msb_mask - 1) << 1) | 1
+    crc_shift = 8 - width if width < 8 else 0
+    table_length = 1 << tbl_idx_width
+    tbl = [[0 for i in range(table_length)] for j in range(slice_by)]
+    for i in range(table_length):
+        reg = i
+        if reflect_in:
+            reg = _reflect(reg, tbl_idx_width)
+        reg = reg << (width - tbl_idx_width + crc_shift)
+        for dummy_j in range(tbl_idx_width):
+            if reg & (msb_mask << crc_shift) != 0:
+                reg = (reg << 1) ^ (poly << crc_shift)
+            else:
+                reg = (reg << 1)
+        if reflect_in:
+            reg = _reflect(reg >> crc_shift, width) << crc_shift
+        tbl[0][i] = (reg >> crc_shift) & mask
+
+    # tbl[j][i] is the CRC of the octet i followed by j zero octets.
+    for j in range(1, slice_by):
+        for i in range(table_length):
+            if reflect_in:
+                tbl[j][i] = (tbl[j - 1][i] >> 8) ^ tbl[0][tbl[j - 1][i] & 0xff]
+            else:
+                tblidx = (tbl[j - 1][i] << crc_shift) >> (width + crc_shift - 8)
+                tbl[j][i] = ((tbl[j - 1][i] << 8) & mask) ^ tbl[0][tblidx]
+    return tuple(tuple(t) for t in tbl)
+
+
+_UPDATE_TEMPLATE = """
+def make_update(tbl, reflect):
+    def update(reg, in_data):
+        {enter}
+        for octet in in_data:
+            {steps}
+        {leave}
+        return reg
+    return update
+"""
+
+
+def _shift_right(expr, shift):
+    """
+    Return the Python expression expr shifted right by shift bits.
+    """
+    return expr if shift == 0 else f"({expr} >> {shift:d})"
+
+
+@functools.lru_cache(maxsize=64)
+def _specialised_update(width, poly, reflect_in, tbl_idx_width):
+    """
+    Return the byte loop of the table_driven CRC algorithm, specialised for
+    the given parameters. The Python source of the loop is generated with the
+    constants folded in and the operations that are no-ops for the parameters
+    left out, and is compiled once; the function is cached.
+    Every octet is processed with 8 / tbl_idx_width table lookups.
+    The returned function has the signature update(reg, in_data) and works on
+    the non-finalised register, like Crc.table_driven_update().
+    """
+    # pylint: disable=too-many-locals
+    tbl = _cached_table(width, poly, reflect_in, tbl_idx_width, 1)[0]
+    idx_mask = (1 << tbl_idx_width) - 1
+    enter = leave = "pass"
+    steps = []
+    if reflect_in:
+        # The register is reflected, the octet is processed from the least significant bit.
+        enter = leave = f"reg = reflect(reg, {width:d})"
+        for data_shift in range(0, 8, tbl_idx_width):
+            idx = f"reg ^ {_shift_right('octet', data_shift)}"
+            if width > tbl_idx_width or data_shift + tbl_idx_width < 8:
+                idx = f"({idx}) & {idx_mask:#x}"
+            if width > tbl_idx_width:
+                steps.append(f"reg = (reg >> {tbl_idx_width:d}) ^ tbl[{idx}]")
+            else:
+                steps.append(f"reg = tbl[{idx}]")
+    else:
+        # Widths below 8 are shifted to the most significant bits of an octet,
+        # and so is the table.
+        crc_shift = max(8 - width, 0)
+        reg_width = width + crc_shift
+        if crc_shift:
+            tbl = tuple(val << crc_shift for val in tbl)
+            enter = f"reg <<= {crc_shift:d}"
+            leave = f"reg >>= {crc_shift:d}"
+        for data_shift in range(8 - tbl_idx_width, -1, -tbl_idx_width):
+            idx = f"{_shift_right('reg', reg_width - tbl_idx_width)} ^ {_shift_right('octet', data_shift)}"
+            if data_shift + tbl_idx_width < 8:
+                idx = f"({idx}) & {idx_mask:#x}"
+            if reg_width > tbl_idx_width:
+                steps.append(f"reg = ((reg << {tbl_idx_width:d}) & {(1 << reg_width) - 1:#x}) ^ tbl[{idx}]")
+            else:
+                steps.append(f"reg = tbl[{idx}]")
+
+    namespace = {}
+    source = _UPDATE_TEMPLATE.format(enter=enter, leave=leave, steps="\n            ".join(steps))
+    name = f"<crc update width={width:d} poly={poly:#x} reflect_in={bool(reflect_in)} tbl_idx_width={tbl_idx_width:d}>"
+    exec(compile(source, name, "exec"), namespace)
+    return namespace["make_update"](tbl, _reflect)
+
+
+def table_cache_info():
+    """
+    Return the statistics of the cache of CRC tables shared by all Crc objects,
+    as a named tuple with the fields hits, misses, maxsize and currsize.
+    """
+    return _cached_table.cache_info()
+
+
+def table_cache_clear():
+    """
+    Clear the cache of CRC tables and its statistics, as well as the cache of
+    the specialised update functions.
+    """
+    _cached_table.cache_clear()
+    _specialised_update.cache_clear()
+
 
 class Crc():
     """
@@ -91,7 +292,10 @@ class Crc():
         else:
             self.crc_shift = 0
 
-        self.tbl = self.gen_table()
+        self.tbl = _cached_table(self.width, self.poly, self.reflect_in, self.tbl_idx_width, self.slice_by)
+        self.__fold_constants = {}
+        # With a 16-bit table index, the odd trailing octet uses the 8-bit loop.
+        self.__update = _specialised_update(self.width, self.poly, self.reflect_in, min(self.tbl_idx_width, 8))
 
     def __get_nondirect_init(self, init):
         """
@@ -112,12 +316,7 @@ class Crc():
         reflect a data word, i.e. reverts the bit order.
         """
         # pylint: disable=no-self-use
-
-        res = data & 0x01
-        for dummy_i in range(width - 1):
-            data >>= 1
-            res = (res << 1) | (data & 0x01)
-        return res
+        return _reflect(data, width)
 
     def bit_by_bit(self, in_data):
         """
@@ -129,10 +328,11 @@ class Crc():
         if isinstance(in_data, str):
             in_data = bytearray(in_data, 'utf-8')
 
+        if self.reflect_in:
+            in_data = bytes(in_data).translate(_REFLECTED_OCTETS)
+
         reg = self.nondirect_init
         for octet in in_data:
-            if self.reflect_in:
-                octet = self.reflect(octet, 8)
             for i in range(8):
                 topbit = reg & self.msb_mask
                 reg = ((reg << 1) & self.mask) | ((octet >> (7 - i)) & 0x01)
@@ -159,10 +359,20 @@ class Crc():
         if isinstance(in_data, str):
             in_data = bytearray(in_data, 'utf-8')
 
-        reg = self.direct_init
+        reg = self.bit_by_bit_fast_update(self.direct_init, in_data)
+        return self.finalize(reg)
+
+    def bit_by_bit_fast_update(self, reg, in_data):
+        """
+        Update the non-finalised register reg with the bytes of in_data, using
+        the bit-by-bit-fast algorithm, and return the new register value.
+        The register starts with the direct_init value and must be passed to
+        finalize() to get the CRC.
+        """
+        if self.reflect_in:
+            in_data = bytes(in_data).translate(_REFLECTED_OCTETS)
+
         for octet in in_data:
-            if self.reflect_in:
-                octet = self.reflect(octet, 8)
             for i in range(8):
                 topbit = reg & self.msb_mask
                 if octet & (0x80 >> i):
@@ -171,62 +381,502 @@ class Crc():
                 if topbit:
                     reg ^= self.poly
             reg &= self.mask
+        return reg
+
+    def finalize(self, reg):
+        """
+        Return the CRC value of the non-finalised register reg, as returned by
+        the bit_by_bit_fast_update() and table_driven_update() functions.
+        """
         if self.reflect_out:
             reg = self.reflect(reg, self.width)
         return reg ^ self.xor_out
 
+    def combine(self, crc1, crc2, len2):
+        """
+        Return the CRC of the concatenation of two messages A and B, given
+        crc1, the CRC of A, crc2, the CRC of B, and len2, the length of B in
+        octets.  This needs O(log(len2)) polynomial multiplications; the
+        messages themselves are not needed.
+        """
+        # The register after A and B is reg(B) ^ (reg(A) ^ init) * x^(8 * len2) mod poly.
+        reg1 = self.__unfinalize(crc1)
+        reg2 = self.__unfinalize(crc2)
+        reg = reg2 ^ self.mulmod(reg1 ^ self.direct_init, self.xpow_mod(8 * len2))
+        return self.finalize(reg)
+
+    def __unfinalize(self, crc):
+        """
+        Return the non-finalised register that finalize() turns into crc.
+        """
+        reg = (crc ^ self.xor_out) & self.mask
+        if self.reflect_out:
+            reg = self.reflect(reg, self.width)
+        return reg
+
+    def mulmod(self, a, b):
+        """
+        Return the product of the polynomials a and b modulo the generator
+        polynomial.  b must be reduced, a may have any degree.
+        """
+        res = 0
+        while a:
+            if a & 1:
+                res ^= b
+            a >>= 1
+            if b & self.msb_mask:
+                b = ((b << 1) & self.mask) ^ self.poly
+            else:
+                b <<= 1
+        return res
+
+    def xpow_mod(self, n):
+        """
+        Return x^n modulo the generator polynomial, calculated by repeated
+        squaring.
+        """
+        square = self.mulmod(2, 1)
+        res = 1
+        while n:
+            if n & 1:
+                res = self.mulmod(res, square)
+            n >>= 1
+            if n:
+                square = self.mulmod(square, square)
+        return res
+
+    def new(self, data=None):
+        """
+        Return a new CrcHash object for this model, with a hashlib-like
+        interface to calculate the CRC of a data stream incrementally.
+        If data is given, it is passed to the update() method of the object.
+        """
+        return CrcHash(self, data)
+
     def gen_table(self):
         """
         This function generates the CRC table used for the table_driven CRC
-        algorithm.  The Python version cannot handle tables of an index width
-        other than 8.  See the generated C code for tables with different sizes
-        instead.
+        algorithm, with 2^table_idx_width entries.
+        The tables are cached for all Crc objects; this function returns a copy.
         """
-        table_length = 1 << self.tbl_idx_width
-        tbl = [[0 for i in range(table_length)] for j in range(self.slice_by)]
-        for i in range(table_length):
-            reg = i
-            if self.reflect_in:
-                reg = self.reflect(reg, self.tbl_idx_width)
-            reg = reg << (self.width - self.tbl_idx_width + self.crc_shift)
-            for dummy_j in range(self.tbl_idx_width):
-                if reg & (self.msb_mask << self.crc_shift) != 0:
-                    reg = (reg << 1) ^ (self.poly << self.crc_shift)
-                else:
-                    reg = (reg << 1)
-            if self.reflect_in:
-                reg = self.reflect(reg >> self.crc_shift, self.width) << self.crc_shift
-            tbl[0][i] = (reg >> self.crc_shift) & self.mask
-
-        for j in range(1, self.slice_by):
-            for i in range(table_length):
-                tbl[j][i] = (tbl[j - 1][i] >> 8) ^ tbl[0][tbl[j - 1][i] & 0xff]
-        return tbl
+        return [list(tbl) for tbl in self.tbl]
 
     def table_driven(self, in_data):
         """
         The Standard table_driven CRC algorithm.
         """
-        # pylint: disable = line-too-long
-
         # If the input data is a string, convert to bytes.
         if isinstance(in_data, str):
             in_data = bytearray(in_data, 'utf-8')
 
-        if not self.reflect_in:
-            reg = self.direct_init << self.crc_shift
-            for octet in in_data:
-                tblidx = ((reg >> (self.width - self.tbl_idx_width + self.crc_shift)) ^ octet) & 0xff
-                reg = ((reg << (self.tbl_idx_width - self.crc_shift)) ^
-                       (self.tbl[0][tblidx] << self.crc_shift)) & (self.mask << self.crc_shift)
-            reg = reg >> self.crc_shift
+        reg = self.table_driven_update(self.direct_init, in_data)
+        return self.finalize(reg)
+
+    def table_driven_update(self, reg, in_data):
+        """
+        Update the non-finalised register reg with the bytes of in_data, using
+        the table-driven algorithm, and return the new register value.
+        The register is the same as the one of bit_by_bit_fast_update(), so
+        both functions can be mixed freely on the same data stream.
+        The byte loop is generated and compiled for the parameters of this
+        object, see _specialised_update().
+        """
+        if self.slice_by > 1 and self.tbl_idx_width == 8:
+            reg, in_data = self.__slice_by_update(reg, in_data)
+        elif self.tbl_idx_width == 16:
+            reg, in_data = self.__idx16_update(reg, in_data)
+        return self.__update(reg, in_data)
+
+    def __idx16_update(self, reg, in_data):
+        """
+        Update the register with the longest prefix of in_data that is a
+        multiple of two octets, using one lookup in the 16-bit table for
+        every two octets.
+        Return the new register value and the remaining octets.
+        """
+        view = memoryview(in_data)
+        end = len(view) & ~1
+        words = array.array('H')
+        words.frombytes(view[:end])
+        if (sys.byteorder == 'little') != bool(self.reflect_in):
+            words.byteswap()
+        tbl = self.tbl[0]
+        if self.reflect_in:
+            reg = self.reflect(reg, self.width)
+            for word in words:
+                reg = (reg >> 16) ^ tbl[(reg ^ word) & 0xffff]
+            reg = self.reflect(reg, self.width)
         else:
-            reg = self.reflect(self.direct_init, self.width)
-            for octet in in_data:
-                tblidx = (reg ^ octet) & 0xff
-                reg = ((reg >> self.tbl_idx_width) ^ self.tbl[0][tblidx]) & self.mask
-            reg = self.reflect(reg, self.width) & self.mask
+            # Align the register to the most significant bit of the index, if it is shorter.
+            reg_shift = max(16 - self.width, 0)
+            top_shift = self.width + reg_shift - 16
+            mask = self.mask
+            for word in words:
+                reg = ((reg << 16) & mask) ^ tbl[((reg << reg_shift) >> top_shift) ^ word]
+        return reg, view[end:]
 
-        if self.reflect_out:
+    def __slice_by_update(self, reg, in_data):
+        """
+        Update the register with the longest prefix of in_data that is a
+        multiple of slice_by octets, reading slice_by octets at a time.
+        Return the new register value and the remaining octets.
+        """
+        view = memoryview(in_data)
+        end = len(view) - len(view) % self.slice_by
+        words = struct.iter_unpack(_SLICE_BY_FORMAT[self.slice_by, self.reflect_in], view[:end])
+        if self.reflect_in:
             reg = self.reflect(reg, self.width)
-        return reg ^ self.xor_out
+            reg = _SLICE_BY_REFLECTED[self.slice_by](self.tbl, reg, words)
+            reg = self.reflect(reg, self.width)
+        else:
+            # Align the register to the most significant bit of the slice, if it is shorter.
+            reg_shift = max(8 * self.slice_by - self.width, 0)
+            reg = _SLICE_BY_NONREFLECTED[self.slice_by](self.tbl, reg, words, reg_shift, self.mask)
+        return reg, view[end:]
+
+    def table_driven_batch(self, messages, offsets=None):
+        """
+        Calculate the CRCs of many messages with the table-driven algorithm.
+        messages is one of:
+            a 2-dimensional numpy array of uint8, with one message per row;
+            a sequence of bytes-like objects (bytes, bytearray, memoryview, ...);
+            a single bytes-like object, if offsets is given.  offsets is a
+            sequence of n + 1 non-decreasing positions, and message i is
+            messages[offsets[i]:offsets[i + 1]].
+
+        If numpy is available and the width is at most 64 bits, the messages
+        are grouped by length and the registers of the messages in a group are
+        updated in lock-step, one octet of every message at a time, with
+        vectorised table lookups.  A numpy array of uint64 is returned.
+        Otherwise the messages are processed one by one and a list is returned.
+        The CRCs are always returned in the order of the messages.
+        """
+        numpy = _numpy()
+        if numpy is not None and isinstance(messages, numpy.ndarray) and offsets is None:
+            if messages.ndim != 2 or messages.dtype != numpy.uint8:
+                raise ValueError("messages must be a 2-dimensional array of uint8")
+            if self.width <= 64:
+                return self.__batch_rows(messages)
+            return [self.table_driven(row.tobytes()) for row in messages]
+
+        if offsets is None:
+            views = [memoryview(msg).cast('B') for msg in messages]
+            if numpy is None or self.width > 64:
+                return [self.table_driven(view) for view in views]
+            buf = numpy.frombuffer(b''.join(views), dtype=numpy.uint8)
+            lengths = numpy.fromiter((len(view) for view in views), dtype=numpy.int64, count=len(views))
+            starts = numpy.cumsum(lengths) - lengths
+        else:
+            view = memoryview(messages).cast('B')
+            if numpy is None or self.width > 64:
+                bounds = list(zip(offsets[:-1], offsets[1:]))
+                if any(start > end for start, end in bounds):
+                    raise ValueError("offsets must be non-decreasing")
+                return [self.table_driven(view[start:end]) for start, end in bounds]
+            buf = numpy.frombuffer(view, dtype=numpy.uint8)
+            offsets = numpy.asarray(offsets, dtype=numpy.int64)
+            lengths = numpy.diff(offsets)
+            if (lengths < 0).any():
+                raise ValueError("offsets must be non-decreasing")
+            starts = offsets[:-1]
+
+        # Group the messages by length and gather every group into a 2-dimensional array.
+        crcs = numpy.zeros(len(lengths), dtype=numpy.uint64)
+        order = numpy.argsort(lengths, kind='stable')
+        group_lengths, group_starts = numpy.unique(lengths[order], return_index=True)
+        group_ends = list(group_starts[1:]) + [len(order)]
+        for length, group_start, group_end in zip(group_lengths, group_starts, group_ends):
+            idx = order[group_start:group_end]
+            rows = buf[starts[idx][:, None] + numpy.arange(length)]
+            crcs[idx] = self.__batch_rows(rows)
+        return crcs
+
+    def __batch_table(self):
+        """
+        Return the table with an index width of 8 bits, used by the batch functions.
+        """
+        return _cached_table(self.width, self.poly, self.reflect_in, 8, 1)[0]
+
+    def __batch_rows(self, data):
+        """
+        Return the CRCs of the rows of the 2-dimensional uint8 numpy array data,
+        as numpy array of uint64.
+        """
+        numpy = _numpy()
+        # Iterate over the columns of a contiguous copy of the transposed data.
+        columns = numpy.ascontiguousarray(data.T)
+
+        reg = numpy.full(len(data), self.direct_init, dtype=numpy.uint64)
+        if self.reflect_in:
+            reg = _numpy_reflect(reg, self.width)
+            tbl = numpy.array(self.__batch_table(), dtype=numpy.uint64)
+            for column in columns:
+                reg = (reg >> numpy.uint64(8)) ^ tbl[(reg ^ column) & numpy.uint64(0xff)]
+            reg = _numpy_reflect(reg, self.width)
+        else:
+            # Widths below 8 are aligned to the most significant bit of an octet.
+            crc_shift = numpy.uint64(self.crc_shift)
+            tbl = numpy.array(self.__batch_table(), dtype=numpy.uint64) << crc_shift
+            idx_shift = numpy.uint64(self.width + self.crc_shift - 8)
+            mask = numpy.uint64(self.mask << self.crc_shift)
+            reg <<= crc_shift
+            for column in columns:
+                reg = ((reg << numpy.uint64(8)) & mask) ^ tbl[(reg >> idx_shift) ^ column]
+            reg >>= crc_shift
+
+        if self.reflect_out:
+            reg = _numpy_reflect(reg, self.width)
+        return reg ^ numpy.uint64(self.xor_out)
+
+    def folding(self, in_data):
+        """
+        Calculate the CRC by dividing large blocks of the message, read as big
+        integers, by the generator polynomial.  This is the fastest of the
+        Python algorithms for long messages.
+        """
+        # If the input data is a string, convert to bytes.
+        if isinstance(in_data, str):
+            in_data = bytearray(in_data, 'utf-8')
+
+        reg = self.folding_update(self.direct_init, in_data)
+        return self.finalize(reg)
+
+    def folding_update(self, reg, in_data):
+        """
+        Update the non-finalised register reg with the bytes-like object
+        in_data, using the folding algorithm, and return the new register
+        value.  The register is the same as the one of bit_by_bit_fast_update().
+
+        A block M of n octets changes the register to (reg * x^(8n) + M * x^Width)
+        mod poly.  The block is converted to an integer with int.from_bytes()
+        and reduced by folding: the high part H above the bit h is replaced
+        by H * (x^h mod poly), which roughly halves the length of the
+        polynomial in every step.  The carry-less multiplication is done with a
+        shift and an xor for every bit of the constant, on the whole block at once.
+        """
+        view = memoryview(in_data)
+        for start in range(0, len(view), _FOLDING_BLOCK_SIZE):
+            block = bytes(view[start:start + _FOLDING_BLOCK_SIZE])
+            if self.reflect_in:
+                block = block.translate(_REFLECTED_OCTETS)
+            bits = 8 * len(block)
+            reg = (reg << bits) ^ (int.from_bytes(block, 'big') << self.width)
+            reg = self.__fold(reg, bits + self.width)
+        return reg
+
+    def __fold(self, reg, bits):
+        """
+        Return the polynomial reg of less than bits bits modulo the generator
+        polynomial.
+        """
+        while bits > self.width + 64:
+            # Split roughly in the middle, at an octet boundary.
+            h = ((bits + self.width) // 2 + 7) // 8 * 8
+            if h not in self.__fold_constants:
+                const = self.xpow_mod(h)
+                self.__fold_constants[h] = [i for i in range(self.width) if const & (1 << i)]
+            high = reg >> h
+            reg &= (1 << h) - 1
+            for i in self.__fold_constants[h]:
+                reg ^= high << i
+            bits = max(h, bits - h + self.width)
+
+        poly = self.poly | (1 << self.width)
+        while reg.bit_length() > self.width:
+            reg ^= poly << (reg.bit_length() - 1 - self.width)
+        return reg
+
+
+class CrcHash():
+    """
+    Calculate the CRC of a data stream incrementally, using the table-driven
+    algorithm of a Crc object.  The interface is similar to the hash objects
+    of the hashlib module:
+
+        crc = Crc(width=16, poly=0x8005,
+                  reflect_in=True, xor_in=0x0000,
+                  reflect_out=True, xor_out=0x0000)
+        h = crc.new()
+        h.update(b"1234")
+        h.update(b"56789")
+        print("{0:#x}".format(h.crcvalue))
+    """
+
+    def __init__(self, crc, data=None):
+        """
+        Create a hash object for the model crc.  Use Crc.new() instead.
+        """
+        self.crc = crc
+        self.digest_size = (crc.width + 7) // 8
+        self._register = crc.direct_init
+        if data is not None:
+            self.update(data)
+
+    def update(self, data):
+        """
+        Update the hash object with the bytes-like object data.
+        """
+        # If the input data is a string, convert to bytes.
+        if isinstance(data, str):
+            data = bytearray(data, 'utf-8')
+        # Process buffers with items wider than an octet, such as array('I'), octet by octet.
+        data = memoryview(data).cast('B')
+        self._register = self.crc.table_driven_update(self._register, data)
+
+    def copy(self):
+        """
+        Return a copy of the hash object, e.g. to calculate the CRC of data
+        sharing a common prefix.
+        """
+        other = CrcHash(self.crc)
+        other._register = self._register
+        return other
+
+    def new(self, data=None):
+        """
+        Return a new hash object for the same model.
+        """
+        return CrcHash(self.crc, data)
+
+    @property
+    def crcvalue(self):
+        """
+        The CRC of the data passed so far to update(), as an integer.
+        """
+        return self.crc.finalize(self._register)
+
+    def digest(self):
+        """
+        Return the CRC of the data passed so far to update(), as big-endian
+        bytes object of digest_size octets.
+        """
+        return self.crcvalue.to_bytes(self.digest_size, 'big')
+
+    def hexdigest(self):
+        """
+        Return the CRC of the data passed so far to update(), as a string of
+        hexadecimal digits.
+        """
+        return self.digest().hex()
+
+
+def _numpy_reflect(arr, width):
+    """
+    Reflect the lower width bits of every element of a numpy array of uint64.
+    The bytes of the elements are reflected with a lookup table and then
+    swapped, which reflects the whole 64 bit word.
+    """
+    numpy = _numpy()
+    octets = numpy.frombuffer(_REFLECTED_OCTETS, dtype=numpy.uint8)[arr.astype('<u8').view(numpy.uint8)]
+    return octets.view('<u8').byteswap().astype(numpy.uint64) >> numpy.uint64(64 - width)
+
+
+# The folding algorithm converts blocks of this many octets to an integer at a time.
+_FOLDING_BLOCK_SIZE = 1 << 16
+
+
+# The slice-by functions below read the data as 32 or 64 bit words.  The first
+# octet of a slice is looked up in tbl[slice_by - 1], the last one in tbl[0].
+
+def _slice_by_4_reflected(tbl, reg, words):
+    """
+    Slice-by-4 loop for reflected algorithms.
+    """
+    tbl0, tbl1, tbl2, tbl3 = tbl
+    for (word,) in words:
+        word ^= reg & 0xffffffff
+        reg = (reg >> 32) ^ tbl3[word & 0xff] ^ tbl2[(word >> 8) & 0xff] ^ \
+            tbl1[(word >> 16) & 0xff] ^ tbl0[word >> 24]
+    return reg
+
+
+def _slice_by_8_reflected(tbl, reg, words):
+    """
+    Slice-by-8 loop for reflected algorithms.
+    """
+    tbl0, tbl1, tbl2, tbl3, tbl4, tbl5, tbl6, tbl7 = tbl
+    for (word,) in words:
+        word ^= reg & 0xffffffffffffffff
+        reg = (reg >> 64) ^ tbl7[word & 0xff] ^ tbl6[(word >> 8) & 0xff] ^ \
+            tbl5[(word >> 16) & 0xff] ^ tbl4[(word >> 24) & 0xff] ^ \
+            tbl3[(word >> 32) & 0xff] ^ tbl2[(word >> 40) & 0xff] ^ \
+            tbl1[(word >> 48) & 0xff] ^ tbl0[word >> 56]
+    return reg
+
+
+def _slice_by_16_reflected(tbl, reg, words):
+    """
+    Slice-by-16 loop for reflected algorithms.
+    """
+    tbl0, tbl1, tbl2, tbl3, tbl4, tbl5, tbl6, tbl7, \
+        tbl8, tbl9, tbl10, tbl11, tbl12, tbl13, tbl14, tbl15 = tbl
+    for word1, word2 in words:
+        word1 ^= reg & 0xffffffffffffffff
+        word2 ^= (reg >> 64) & 0xffffffffffffffff
+        reg = (reg >> 128) ^ tbl15[word1 & 0xff] ^ tbl14[(word1 >> 8) & 0xff] ^ \
+            tbl13[(word1 >> 16) & 0xff] ^ tbl12[(word1 >> 24) & 0xff] ^ \
+            tbl11[(word1 >> 32) & 0xff] ^ tbl10[(word1 >> 40) & 0xff] ^ \
+            tbl9[(word1 >> 48) & 0xff] ^ tbl8[word1 >> 56] ^ \
+            tbl7[word2 & 0xff] ^ tbl6[(word2 >> 8) & 0xff] ^ \
+            tbl5[(word2 >> 16) & 0xff] ^ tbl4[(word2 >> 24) & 0xff] ^ \
+            tbl3[(word2 >> 32) & 0xff] ^ tbl2[(word2 >> 40) & 0xff] ^ \
+            tbl1[(word2 >> 48) & 0xff] ^ tbl0[word2 >> 56]
+    return reg
+
+
+def _slice_by_4_nonreflected(tbl, reg, words, reg_shift, mask):
+    """
+    Slice-by-4 loop for non-reflected algorithms.
+    """
+    tbl0, tbl1, tbl2, tbl3 = tbl
+    top_shift = (mask.bit_length() + reg_shift) - 32
+    for (word,) in words:
+        word ^= (reg << reg_shift) >> top_shift
+        reg = ((reg << 32) & mask) ^ tbl3[word >> 24] ^ tbl2[(word >> 16) & 0xff] ^ \
+            tbl1[(word >> 8) & 0xff] ^ tbl0[word & 0xff]
+    return reg
+
+
+def _slice_by_8_nonreflected(tbl, reg, words, reg_shift, mask):
+    """
+    Slice-by-8 loop for non-reflected algorithms.
+    """
+    tbl0, tbl1, tbl2, tbl3, tbl4, tbl5, tbl6, tbl7 = tbl
+    top_shift = (mask.bit_length() + reg_shift) - 64
+    for (word,) in words:
+        word ^= (reg << reg_shift) >> top_shift
+        reg = ((reg << 64) & mask) ^ tbl7[word >> 56] ^ tbl6[(word >> 48) & 0xff] ^ \
+            tbl5[(word >> 40) & 0xff] ^ tbl4[(word >> 32) & 0xff] ^ \
+            tbl3[(word >> 24) & 0xff] ^ tbl2[(word >> 16) & 0xff] ^ \
+            tbl1[(word >> 8) & 0xff] ^ tbl0[word & 0xff]
+    return reg
+
+
+def _slice_by_16_nonreflected(tbl, reg, words, reg_shift, mask):
+    """
+    Slice-by-16 loop for non-reflected algorithms.
+    """
+    tbl0, tbl1, tbl2, tbl3, tbl4, tbl5, tbl6, tbl7, \
+        tbl8, tbl9, tbl10, tbl11, tbl12, tbl13, tbl14, tbl15 = tbl
+    top_shift = (mask.bit_length() + reg_shift) - 128
+    for word1, word2 in words:
+        top = (reg << reg_shift) >> top_shift
+        word1 ^= top >> 64
+        word2 ^= top & 0xffffffffffffffff
+        reg = ((reg << 128) & mask) ^ tbl15[word1 >> 56] ^ tbl14[(word1 >> 48) & 0xff] ^ \
+            tbl13[(word1 >> 40) & 0xff] ^ tbl12[(word1 >> 32) & 0xff] ^ \
+            tbl11[(word1 >> 24) & 0xff] ^ tbl10[(word1 >> 16) & 0xff] ^ \
+            tbl9[(word1 >> 8) & 0xff] ^ tbl8[word1 & 0xff] ^ \
+            tbl7[word2 >> 56] ^ tbl6[(word2 >> 48) & 0xff] ^ \
+            tbl5[(word2 >> 40) & 0xff] ^ tbl4[(word2 >> 32) & 0xff] ^ \
+            tbl3[(word2 >> 24) & 0xff] ^ tbl2[(word2 >> 16) & 0xff] ^ \
+            tbl1[(word2 >> 8) & 0xff] ^ tbl0[word2 & 0xff]
+    return reg
+
+
+_SLICE_BY_FORMAT = {
+    (4, True): '<L', (8, True): '<Q', (16, True): '<QQ',
+    (4, False): '>L', (8, False): '>Q', (16, False): '>QQ',
+}
+_SLICE_BY_REFLECTED = {4: _slice_by_4_reflected, 8: _slice_by_8_reflected, 16: _slice_by_16_reflected}
+_SLICE_BY_NONREFLECTED = {4: _slice_by_4_nonreflected, 8: _slice_by_8_nonreflected, 16: _slice_by_16_nonreflected}
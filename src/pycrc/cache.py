@@ -0,0 +1,130 @@
+#  pycrc -- parameterisable CRC calculation utility and C source code generator
+#
+#  Copyright (c) 2017  Thomas Pircher  <tehpeh-web@tty1.net>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+
+
+"""
+An on-disk cache for the generated source code.
+
+Every generated file is stored in the cache directory under the SHA-256 hash
+of the options it was generated with and of the pycrc version. The
+modification time of a file is updated whenever it is used, and the least
+recently used files are removed when the directory grows beyond its size
+limit. Several pycrc processes may share a cache directory.
+
+    import pycrc.cache as cache
+
+    key = cache.cache_key(opt)
+    f = cache.open_entry(opt.cache_dir, key)
+    if f is None:
+        f = cache.store(opt.cache_dir, key, code, opt.cache_size)
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+# The options that determine the generated code.
+_key_options = [
+        'action', 'width', 'poly', 'reflect_in', 'xor_in', 'reflect_out', 'xor_out',
+        'algorithm', 'tbl_idx_width', 'slice_by', 'clmul', 'combine', 'c_std',
+        'symbol_prefix', 'crc_type', 'include_files', 'undefined_crc_parameters',
+        'timestamp', 'version_str', 'web_address',
+        ]
+
+_key_re = re.compile('^[0-9a-f]{64}$')
+
+
+def cache_key(opt):
+    """
+    Return the key of the code generated with the Options opt.
+    Only the name of the output file is part of the key, as the directory does
+    not appear in the generated code.
+    """
+    params = {name: getattr(opt, name) for name in _key_options}
+    params['output_file'] = None if opt.output_file is None else os.path.basename(opt.output_file)
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def open_entry(cache_dir, key):
+    """
+    Return the cached file for key, opened for reading, or None if there is
+    no such file. The file is marked as recently used.
+    """
+    path = os.path.join(cache_dir, key)
+    try:
+        f = open(path)
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        # Removed by another process in the meantime; the open file can still be read.
+        pass
+    return f
+
+
+def store(cache_dir, key, code, max_size):
+    """
+    Write the CodeGen object code to the cache under key and remove the least
+    recently used files until the cache holds at most max_size bytes.
+    Return the new file, opened for reading.
+    The file is written under a temporary name and renamed, so that other
+    processes never see a partially written file.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp-')
+    try:
+        with open(fd, 'w') as f:
+            code.write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    # Open the file before the eviction, which may remove it if it is larger than max_size.
+    f = open(path)
+    evict(cache_dir, max_size)
+    return f
+
+
+def evict(cache_dir, max_size):
+    """
+    Remove the least recently used files from the cache until it holds at
+    most max_size bytes.
+    """
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if _key_re.match(entry.name) and entry.is_file():
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
@@ -42,36 +42,66 @@ class CodeGen(object):
     """
     The symbol table class.
     """
-    def __init__(self, opt, indent, content=[]):
+    def __init__(self, opt, indent, content=[], sym=None):
         """
         The class constructor.
+
+        sym is the symbol table to use. If it is None, the symbol table is
+        created on first use, as most nodes of the tree never need it.
         """
         self.opt = opt
-        self.sym = pycrc.symtable.SymbolTable(opt)
+        self._sym = sym
         self.indent = indent
         self.content = content
 
-    def gen(self, indent=''):
+    @property
+    def sym(self):
         """
-        Return an array of strings.
+        The symbol table of this node.
+        """
+        if self._sym is None:
+            self._sym = pycrc.symtable.SymbolTable(self.opt)
+        return self._sym
+
+    def iter_lines(self, indent=''):
+        """
+        Yield the strings of the code one by one, without building a list of
+        all strings first.
         """
-        out = []
         if self.indent is None:
             indent = ''
         else:
             indent += self.indent
         for item in self.content:
             if isinstance(item, str):
-                out.append(indent + item)
+                yield indent + item
             else:
-                out += item.gen(indent)
-        return out
+                yield from item.iter_lines(indent)
+
+    def gen(self, indent=''):
+        """
+        Return an array of strings.
+        """
+        return list(self.iter_lines(indent))
+
+    def write(self, out_file):
+        """
+        Write the code to the file object out_file as it is generated. The
+        output is the same as str(self), i.e. without a final newline.
+        """
+        lines = self.iter_lines()
+        for line in lines:
+            out_file.write(line.rstrip())
+            break
+        for line in lines:
+            out_file.write('\n')
+            out_file.write(line.rstrip())
 
     def __str__(self):
         """
         Stringify the object.
         """
-        return '\n'.join([i.rstrip() for i in self.gen()])
+        return '\n'.join([i.rstrip() for i in self.iter_lines()])
 
 
 class Conditional(CodeGen):
@@ -122,11 +152,11 @@ class ParamBlock(CodeGen):
     """
     Print the parameters of the model.
     """
-    def __init__(self, opt, indent, algorithm=False):
+    def __init__(self, opt, indent, algorithm=False, sym=None):
         """
         The class constructor.
         """
-        super(ParamBlock, self).__init__(opt, indent)
+        super(ParamBlock, self).__init__(opt, indent, sym=sym)
         self.content = [
                 '- {0:13s} = {1}'.format('Width', self.sym.crc_width),
                 '- {0:13s} = {1}'.format('Poly', self.sym.crc_poly),
@@ -159,7 +189,7 @@ class File(CodeGen):
         if opt.action == opt.action_generate_c_main:
             self.content = self._code_file() + self._c_file() + self._main_file()
         if opt.action == opt.action_generate_table:
-            self.content = [f'{self.sym.crc_table_init}']
+            self.content = self.sym.crc_table_init
 
     def _code_file(self):
         """
@@ -170,10 +200,14 @@ class File(CodeGen):
                     '\\file',
                     'Functions and types for CRC checks.',
                     '',
-                    f'Generated on {self.sym.datetime}',
-                    f'by {self.sym.program_version}, {self.sym.program_url}',
+                    Conditional2(self.opt, '', self.opt.timestamp, [
+                        f'Generated on {self.sym.datetime}',
+                        f'by {self.sym.program_version}, {self.sym.program_url}',
+                        ], [
+                        f'Generated by {self.sym.program_version}, {self.sym.program_url}',
+                        ]),
                     'using the configuration:',
-                    ParamBlock(self.opt, ' ', algorithm=True),
+                    ParamBlock(self.opt, ' ', algorithm=True, sym=self.sym),
                     Conditional(self.opt, '', self.opt.action == self.opt.action_generate_h, [
                         '',
                         f'This file defines the functions {self.sym.crc_init_function}(), {self.sym.crc_update_function}() and {self.sym.crc_finalize_function}().',
@@ -383,6 +417,18 @@ class File(CodeGen):
                     ], [
                     '{0};'.format(_crc_finalize_function_def(self.opt, self.sym)),
                     ]),
+                Conditional(self.opt, '', self.opt.combine, [
+                    '', '',
+                    Comment(self.opt, '', [
+                        'Combine the final crc values of two messages.',
+                        '',
+                        '\\param[in] crc1  The final crc value of the first message.',
+                        '\\param[in] crc2  The final crc value of the second message.',
+                        '\\param[in] len2  The length of the second message in bytes.',
+                        '\\return      The final crc value of the concatenation of both messages.',
+                        ]),
+                    '{0};'.format(_crc_combine_function_def(self.opt, self.sym)),
+                    ]),
                 '', '',
                 '#ifdef __cplusplus',
                 '}           /* closing brace for extern "C" */',
@@ -412,6 +458,11 @@ class File(CodeGen):
                 Conditional(self.opt, '', self.opt.slice_by > 1, [
                     '#include <endian.h>',
                     ]),
+                Conditional(self.opt, '', self.opt.clmul, [
+                    '#if defined(__x86_64__) && defined(__GNUC__)',
+                    '#include <immintrin.h>',
+                    '#endif',
+                    ]),
                 Conditional(self.opt, '', _use_reflect_func(self.opt) and _use_static_reflect_func(self.opt), [
                     '',
                     f'static {self.sym.crc_t} {self.sym.crc_reflect_function}({self.sym.crc_t} data, size_t data_len);',
@@ -421,8 +472,10 @@ class File(CodeGen):
                 CodeGen(self.opt, '', _crc_reflect_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_init_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_table_gen(self.opt, self.sym)),
+                CodeGen(self.opt, '', _crc_clmul_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_update_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_finalize_function_gen(self.opt, self.sym)),
+                CodeGen(self.opt, '', _crc_combine_function_gen(self.opt, self.sym)),
                 '',
                 ]
         return out
@@ -965,6 +1018,13 @@ def _crc_finalize_function_def(opt, sym):
         return f'{sym.crc_t} {sym.crc_finalize_function}(const {sym.cfg_t} *cfg, {sym.crc_t} crc)'
 
 
+def _crc_combine_function_def(opt, sym):
+    """
+    The definition of the combine function.
+    """
+    return f'{sym.crc_t} {sym.crc_combine_function}({sym.crc_t} crc1, {sym.crc_t} crc2, size_t len2)'
+
+
 def _crc_final_value(opt, sym):
     """
     The return value for the finalize function.
@@ -995,18 +1055,26 @@ def _crc_table(opt, sym):
                     f'Must be initialised with the {sym.crc_table_gen_function} function.',
                     ]),
                 ]),
-            Conditional2(opt, '', _use_constant_crc_table(opt), [
-                Conditional2(opt, '', opt.slice_by > 1, [
-                    f'static const {sym.crc_t} crc_table[{sym.crc_slice_by}][{sym.crc_table_width}] = {sym.crc_table_init};',
-                    ], [
-                    f'static const {sym.crc_t} crc_table[{sym.crc_table_width}] = {sym.crc_table_init};',
-                    ]),
-                ], [
+            Conditional2(opt, '', _use_constant_crc_table(opt), _crc_table_definition(opt, sym), [
                 f'static {sym.crc_t} crc_table[{sym.crc_table_width}];',
                 ]),
             ]
 
 
+def _crc_table_definition(opt, sym):
+    """
+    Return the lines of the definition of the constant CRC table.
+    """
+    if not _use_constant_crc_table(opt):
+        return []
+    if opt.slice_by > 1:
+        declaration = f'static const {sym.crc_t} crc_table[{sym.crc_slice_by}][{sym.crc_table_width}]'
+    else:
+        declaration = f'static const {sym.crc_t} crc_table[{sym.crc_table_width}]'
+    table_init = sym.crc_table_init
+    return [f'{declaration} = {table_init[0]}'] + table_init[1:-1] + [table_init[-1] + ';']
+
+
 def _crc_table_gen(opt, sym):
     """
     Return the code for the CRC table or the generator function.
@@ -1295,6 +1363,27 @@ def _crc_update_function_gen(opt, sym):
                             ]),
                         '}',
                         ], [
+                            Conditional(opt, '', opt.clmul, [
+                                CodeGen(opt, None, [
+                                    '#if defined(__x86_64__) && defined(__GNUC__)',
+                                    ]),
+                                '/* Fold multiples of 16 bytes with carry-less multiplications, if the CPU supports them */',
+                                'if (data_len >= 64 && __builtin_cpu_supports("pclmul") && __builtin_cpu_supports("ssse3")) {',
+                                CodeGen(opt, 4*' ', [
+                                    'unsigned char rem[16];',
+                                    'size_t len = data_len & ~(size_t)15;',
+                                    '',
+                                    f'{sym.crc_clmul_fold_function}(crc, d, len, rem);',
+                                    f'crc = {sym.crc_update_function}(0, rem, 16);',
+                                    'd += len;',
+                                    'data_len -= len;',
+                                    ]),
+                                '}',
+                                CodeGen(opt, None, [
+                                    '#endif',
+                                    ]),
+                                '',
+                                ]),
                             Conditional(opt, '', opt.slice_by > 1, [
                                 f'/* Align to a multiple of {sym.crc_slice_by} bytes */',
                                 f'while (data_len && (((uintptr_t)(const void *)d) % {sym.crc_slice_by} != 0))' + ' {',
@@ -1306,7 +1395,19 @@ def _crc_update_function_gen(opt, sym):
                                 '',
                                 _crc_table_slice_by_algorithm(opt, sym),
                                 '/* Remaining bytes with the standard algorithm */',
-                                'd = (const unsigned char *)d32;',
+                                f'd = (const unsigned char *)d{_slice_by_word_width(opt):d};',
+                                ]),
+                            Conditional(opt, '', opt.tbl_idx_width == 16, [
+                                '/* Two bytes at a time with the 16-bit table index */',
+                                'while (data_len >= 2) {',
+                                CodeGen(opt, 4*' ', [
+                                    _crc_table_idx16_algorithm(opt, sym),
+                                    'd += 2;',
+                                    'data_len -= 2;',
+                                    ]),
+                                '}',
+                                '',
+                                '/* Remaining byte */',
                                 ]),
                             'while (data_len--) {',
                             CodeGen(opt, 4*' ', [
@@ -1323,6 +1424,97 @@ def _crc_update_function_gen(opt, sym):
     return out
 
 
+def _crc_clmul_function_gen(opt, sym):
+    """
+    Return the code of the functions that fold the data with carry-less
+    multiplications.
+
+    The register is xored into the first 16 bytes of the data, and the data is
+    folded in four parallel 128-bit blocks, then into a single block, with the
+    constants from symtable._get_clmul_constants(). The remaining block has the
+    same CRC as the data, so it is returned to the caller, who finishes with the
+    table-driven algorithm.
+    """
+    if not opt.clmul:
+        return []
+    k16_hi, k16_lo = sym.crc_clmul_k16
+    k64_hi, k64_lo = sym.crc_clmul_k64
+    if opt.reflect_in:
+        crc_block = '_mm_set_epi64x(0, (long long)crc)'
+    else:
+        crc_block = '_mm_set_epi64x((long long)((uint64_t)crc << {0:d}), 0)'.format(64 - opt.width)
+
+    def load(ptr):
+        if opt.reflect_in:
+            return f'_mm_loadu_si128((const __m128i *)({ptr}))'
+        return f'_mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)({ptr})), bswap)'
+
+    def fold(x, k, data):
+        return f'{x} = {sym.crc_clmul_fold_block_function}({x}, {k}, {data});'
+
+    return [
+            '', '',
+            '#if defined(__x86_64__) && defined(__GNUC__)',
+            '__attribute__((target("pclmul,ssse3")))',
+            f'static __m128i {sym.crc_clmul_fold_block_function}(__m128i x, __m128i k, __m128i data)',
+            '{',
+            CodeGen(opt, 4*' ', [
+                '__m128i lo = _mm_clmulepi64_si128(x, k, 0x00);',
+                '__m128i hi = _mm_clmulepi64_si128(x, k, 0x11);',
+                '',
+                'return _mm_xor_si128(_mm_xor_si128(lo, hi), data);',
+                ]),
+            '}',
+            '',
+            '',
+            '__attribute__((target("pclmul,ssse3")))',
+            f'static void {sym.crc_clmul_fold_function}({sym.crc_t} crc, const unsigned char *d, size_t data_len, '
+            'unsigned char *rem)',
+            '{',
+            CodeGen(opt, 4*' ', [
+                f'const __m128i k16 = _mm_set_epi64x((long long){k16_hi}, (long long){k16_lo});',
+                f'const __m128i k64 = _mm_set_epi64x((long long){k64_hi}, (long long){k64_lo});',
+                Conditional(opt, '', not opt.reflect_in, [
+                    'const __m128i bswap = _mm_set_epi8(0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15);',
+                    ]),
+                '__m128i x0, x1, x2, x3;',
+                '',
+                f'x0 = _mm_xor_si128({load("d")}, {crc_block});',
+                f'x1 = {load("d + 16")};',
+                f'x2 = {load("d + 32")};',
+                f'x3 = {load("d + 48")};',
+                'd += 64;',
+                'data_len -= 64;',
+                'while (data_len >= 64) {',
+                CodeGen(opt, 4*' ', [
+                    fold('x0', 'k64', load('d')),
+                    fold('x1', 'k64', load('d + 16')),
+                    fold('x2', 'k64', load('d + 32')),
+                    fold('x3', 'k64', load('d + 48')),
+                    'd += 64;',
+                    'data_len -= 64;',
+                    ]),
+                '}',
+                fold('x0', 'k16', 'x1'),
+                fold('x0', 'k16', 'x2'),
+                fold('x0', 'k16', 'x3'),
+                'while (data_len >= 16) {',
+                CodeGen(opt, 4*' ', [
+                    fold('x0', 'k16', load('d')),
+                    'd += 16;',
+                    'data_len -= 16;',
+                    ]),
+                '}',
+                Conditional(opt, '', not opt.reflect_in, [
+                    'x0 = _mm_shuffle_epi8(x0, bswap);',
+                    ]),
+                '_mm_storeu_si128((__m128i *)rem, x0);',
+                ]),
+            '}',
+            '#endif',
+            ]
+
+
 def _crc_finalize_function_gen(opt, sym):
     """
     Return the code for the finalize function.
@@ -1411,6 +1603,87 @@ def _crc_finalize_function_gen(opt, sym):
     return out
 
 
+def _crc_combine_function_gen(opt, sym):
+    """
+    Return the code for the combine function.
+
+    The final crc value of the concatenation is crc2 ^ (crc1 ^ xor_out ^ init) * x^(8 * len2) mod Poly.
+    All constants, including the powers x^(8 * 2^k) mod Poly that make up x^(8 * len2), come from
+    symtable._get_combine_constants() and are in the bit order of the final crc value, so that the
+    final values can be combined without reflecting them back.
+    """
+    if not opt.combine:
+        return []
+    const = sym.crc_combine_constants
+    xpow8 = const['xpow8']
+    if opt.width > 32:
+        values_per_line = 4
+    elif opt.width >= 16:
+        values_per_line = 8
+    else:
+        values_per_line = 16
+    return [
+            '', '',
+            f'static {sym.crc_t} {sym.crc_combine_mulmod_function}({sym.crc_t} a, {sym.crc_t} b)',
+            '{',
+            CodeGen(opt, 4*' ', [
+                f'{sym.crc_t} res = 0;',
+                'unsigned int i;',
+                '',
+                Conditional2(opt, '', opt.reflect_out, [
+                    f'for (i = 0; i < {sym.crc_width}; i++) {{',
+                    CodeGen(opt, 4*' ', [
+                        f'res = (res >> 1) ^ ((res & 1) ? {const["poly"]} : 0);',
+                        'if ((a >> i) & 1) {',
+                        CodeGen(opt, 4*' ', ['res ^= b;']),
+                        '}',
+                        ]),
+                    '}',
+                    ], [
+                    f'for (i = {sym.crc_width}; i > 0; i--) {{',
+                    CodeGen(opt, 4*' ', [
+                        f'res = ((res << 1) ^ ((res & {sym.crc_msb_mask}) ? {const["poly"]} : 0)) & {sym.crc_mask};',
+                        'if ((a >> (i - 1)) & 1) {',
+                        CodeGen(opt, 4*' ', ['res ^= b;']),
+                        '}',
+                        ]),
+                    '}',
+                    ]),
+                'return res;',
+                ]),
+            '}',
+            '', '',
+            _crc_combine_function_def(opt, sym),
+            '{',
+            CodeGen(opt, 4*' ', [
+                f'static const {sym.crc_t} xpow8[{len(xpow8)}] = {{',
+                CodeGen(opt, 4*' ', [
+                    ', '.join(xpow8[i:i + values_per_line]) + (',' if i + values_per_line < len(xpow8) else '')
+                    for i in range(0, len(xpow8), values_per_line)
+                    ]),
+                '};',
+                f'{sym.crc_t} xpow = {const["one"]};',
+                'unsigned int k;',
+                '',
+                'for (k = 0; len2 != 0; k++, len2 >>= 1) {',
+                CodeGen(opt, 4*' ', [
+                    'if (len2 & 1) {',
+                    CodeGen(opt, 4*' ', [
+                        f'xpow = {sym.crc_combine_mulmod_function}(xpow, xpow8[k]);',
+                        ]),
+                    '}',
+                    ]),
+                '}',
+                Conditional2(opt, '', int(const['xor'], 16) == 0, [
+                    f'return crc2 ^ {sym.crc_combine_mulmod_function}(crc1, xpow);',
+                    ], [
+                    f'return crc2 ^ {sym.crc_combine_mulmod_function}(crc1 ^ {const["xor"]}, xpow);',
+                    ]),
+                ]),
+            '}',
+            ]
+
+
 def _crc_table_core_algorithm(opt, sym):
     """
     Return the core of the table-driven algorithm.
@@ -1437,7 +1710,14 @@ def _crc_table_core_algorithm_reflected(opt, sym):
     else:
         crc_xor_expr = f'(crc >> {sym.cfg_table_idx_width})'
 
-    if opt.tbl_idx_width == 8:
+    if opt.tbl_idx_width == 16:
+        # A single octet, whose entry in the 16-bit table is at the octet shifted to the upper half of the index.
+        crc_exp = expr.And(expr.Parenthesis(expr.Xor('crc_table[tbl_idx << 8]', '(crc >> 8)')), sym.cfg_mask).simplify()
+        out += [
+                'tbl_idx = (crc ^ *d) & 0xff;',
+                f'crc = {crc_exp};',
+                ]
+    elif opt.tbl_idx_width == 8:
         if opt.slice_by > 1:
             crc_lookup = 'crc_table[0][tbl_idx]'
         else:
@@ -1484,7 +1764,15 @@ def _crc_table_core_algorithm_nonreflected(opt, sym):
     else:
         crc_xor_expr = f'(crc << {sym.cfg_table_idx_width})'
 
-    if opt.tbl_idx_width == 8:
+    if opt.tbl_idx_width == 16:
+        # A single octet, whose entry in the 16-bit table is at the octet itself.
+        crc_shifted_right = expr.Parenthesis(expr.Shr('crc', opt.width - 8)).simplify()
+        out += [
+                'tbl_idx = {0};'.format(expr.And(expr.Parenthesis(expr.Xor(crc_shifted_right, '*d')), '0xff').simplify()),
+                'crc = {0};'.format(expr.And(expr.Parenthesis(expr.Xor('crc_table[tbl_idx]', '(crc << 8)')),
+                                             sym.cfg_mask).simplify())
+                ]
+    elif opt.tbl_idx_width == 8:
         if opt.slice_by > 1:
             crc_lookup = 'crc_table[0][tbl_idx]'
         else:
@@ -1509,52 +1797,86 @@ def _crc_table_core_algorithm_nonreflected(opt, sym):
     return CodeGen(opt, '', out)
 
 
+def _crc_table_idx16_algorithm(opt, sym):
+    """
+    Return the core of the table-driven algorithm with a 16-bit table index,
+    which processes the two bytes d[0] and d[1] with one lookup.
+    """
+    if opt.tbl_idx_width != 16:
+        return CodeGen(opt, '', [])
+    if opt.width <= 16:
+        crc_xor_expr = '0'
+    elif opt.reflect_in:
+        crc_xor_expr = '(crc >> 16)'
+    else:
+        crc_xor_expr = '(crc << 16)'
+    if opt.reflect_in:
+        idx = expr.Xor('crc', '(d[0] | (d[1] << 8))')
+    else:
+        idx = expr.Xor(expr.Parenthesis(expr.Shr('crc', opt.width - 16)).simplify(), '(d[0] << 8 | d[1])')
+    out = [
+        'tbl_idx = {0};'.format(expr.And(expr.Parenthesis(idx), sym.crc_table_mask).simplify()),
+        'crc = {0};'.format(expr.And(expr.Parenthesis(expr.Xor('crc_table[tbl_idx]', crc_xor_expr)), sym.cfg_mask).simplify()),
+        ]
+    return CodeGen(opt, '', out)
+
+
+def _slice_by_word_width(opt):
+    """
+    Return the width of the words read by the slice-by loop: 64 bits for
+    registers wider than 32 bits, if the slice is large enough, else 32 bits.
+    """
+    if opt.width is not None and opt.width > 32 and opt.slice_by >= 8:
+        return 64
+    return 32
+
+
 def _crc_table_slice_by_algorithm(opt, sym):
-    update_be = []
-    for i in range(opt.slice_by // 4):
-        vard = 'd{0}'.format(opt.slice_by // 4 - i)
-        for j in range(4):
-            idx1 = i * 4 + j
-            idx2 = expr.And(expr.Parenthesis(expr.Shr(vard, j*8)), expr.Terminal(255, '0xffu')).simplify()
-            update_be.append('crc_table[{0}][{1}]{2}'.format(idx1, idx2, ' ^' if idx1 < opt.slice_by - 1 else ';'))
-
-    update_le = []
-    for i in range(opt.slice_by // 4):
-        vard = 'd{0}'.format(opt.slice_by // 4 - i)
-        for j in range(4):
-            idx1 = i * 4 + j
-            idx2 = expr.And(expr.Parenthesis(expr.Shr(vard, 24 - j*8)), expr.Terminal(255, '0xffu')).simplify()
-            update_le.append('crc_table[{0}][{1}]{2}'.format(idx1, idx2, ' ^' if idx1 < opt.slice_by - 1 else ';'))
+    """
+    Return the code of the slice-by loop.
+    """
+    if opt.slice_by == 1:
+        return CodeGen(opt, '', [])
+    word_width = _slice_by_word_width(opt)
+    word_t = f'uint{word_width:d}_t'
+    num_words = opt.slice_by * 8 // word_width
+    update_be = _crc_table_slice_by_lookups(opt, sym, word_width, big_endian=True)
+    update_le = _crc_table_slice_by_lookups(opt, sym, word_width, big_endian=False)
+
+    # The register is xored into the first word if the octet order of the
+    # word matches the bit order of the algorithm; else, every octet of the
+    # first word is combined with its part of the register before the lookup.
+    if opt.reflect_in:
+        crc_word = 'crc'
+    elif opt.width <= word_width:
+        crc_word = expr.Parenthesis(expr.Shl(f'({word_t})crc', word_width - opt.width)).simplify()
+    else:
+        crc_word = expr.Parenthesis(expr.Shr('crc', opt.width - word_width)).simplify()
+
+    def load_words(xor_crc):
+        out = []
+        for i in range(num_words):
+            if i == 0 and xor_crc:
+                out.append(f'{word_t} d1 = *d{word_width:d}++ ^ {crc_word};')
+            else:
+                out.append(f'{word_t} d{i + 1:d} = *d{word_width:d}++;')
+        return out
 
     out = [
-            'const uint32_t *d32 = (const uint32_t *)d;',
+            f'const {word_t} *d{word_width:d} = (const {word_t} *)d;',
             f'while (data_len >= {sym.crc_slice_by})',
             '{',
             CodeGen(opt, 4*' ', [
                 CodeGen(opt, None, [
                     '#if __BYTE_ORDER == __BIG_ENDIAN',
                     ]),
-                f'{sym.crc_t} d1 = *d32++ ^ le16toh(crc);',
-                Conditional(opt, '', opt.slice_by >= 8, [
-                    f'{sym.crc_t} d2 = *d32++;',
-                    ]),
-                Conditional(opt, '', opt.slice_by >= 16, [
-                    f'{sym.crc_t} d3 = *d32++;',
-                    f'{sym.crc_t} d4 = *d32++;',
-                    ]),
+                CodeGen(opt, '', load_words(not opt.reflect_in)),
                 'crc  =',
                 CodeGen(opt, 4*' ', update_be),
                 CodeGen(opt, None, [
                     '#else',
                     ]),
-                f'{sym.crc_t} d1 = *d32++ ^ crc;',
-                Conditional(opt, '', opt.slice_by >= 8, [
-                    f'{sym.crc_t} d2 = *d32++;',
-                    ]),
-                Conditional(opt, '', opt.slice_by >= 16, [
-                    f'{sym.crc_t} d3 = *d32++;',
-                    f'{sym.crc_t} d4 = *d32++;',
-                    ]),
+                CodeGen(opt, '', load_words(opt.reflect_in)),
                 'crc  =',
                 CodeGen(opt, 4*' ', update_le),
                 CodeGen(opt, None, [
@@ -1567,3 +1889,55 @@ def _crc_table_slice_by_algorithm(opt, sym):
             '',
             ]
     return CodeGen(opt, '', out)
+
+
+def _crc_table_slice_by_lookups(opt, sym, word_width, big_endian):
+    """
+    Return the table lookups of the slice-by loop, for big endian or for
+    little endian machines.
+
+    The n-th octet of a slice is looked up in crc_table[slice_by - 1 - n].
+    The register is combined with the first word in the order in which the
+    octets enter the register, i.e. LSB first for reflected algorithms and MSB
+    first for non-reflected algorithms. If the octet order of the machine does
+    not match, the register is combined octet by octet.
+    """
+    octets_per_word = word_width // 8
+    crc_per_octet = big_endian == bool(opt.reflect_in)
+
+    lookups = []
+    for octet in range(opt.slice_by):
+        word, pos = divmod(octet, octets_per_word)
+        shift = word_width - 8 - 8 * pos if big_endian else 8 * pos
+        idx = expr.Shr(f'd{word + 1:d}', shift).simplify()
+        crc_shift = _crc_octet_shift(opt, octet)
+        if crc_per_octet and crc_shift is not None:
+            if crc_shift >= 0:
+                crc_part = expr.Parenthesis(expr.Shr('crc', crc_shift)).simplify()
+            else:
+                crc_part = expr.Parenthesis(expr.Shl('crc', -crc_shift)).simplify()
+            idx = expr.Xor(crc_part, expr.Parenthesis(idx).simplify())
+        idx = expr.And(expr.Parenthesis(idx).simplify(), expr.Terminal(255, '0xffu')).simplify()
+        lookups.append(f'crc_table[{opt.slice_by - 1 - octet:d}][{idx}]')
+
+    # Registers wider than the slice keep the part that was not shifted out.
+    if opt.width > opt.slice_by * 8:
+        if opt.reflect_in:
+            lookups.insert(0, f'(crc >> {opt.slice_by * 8:d})')
+        else:
+            lookups.insert(0, f'((crc << {opt.slice_by * 8:d}) & {sym.crc_mask})')
+    return [lookup + (' ^' if i < len(lookups) - 1 else ';') for i, lookup in enumerate(lookups)]
+
+
+def _crc_octet_shift(opt, octet):
+    """
+    Return the right shift of the register that aligns the part of the
+    register to be combined with the given octet of a slice to the lowest
+    octet, or None if the register does not reach that octet.
+    A negative value is a left shift.
+    """
+    if octet * 8 >= opt.width:
+        return None
+    if opt.reflect_in:
+        return octet * 8
+    return opt.width - 8 - octet * 8
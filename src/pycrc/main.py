@@ -29,7 +29,8 @@ utility and C source code generator written in Python.
 
 It can:
     -  generate the checksum of a string
-    -  generate the checksum of a file
+    -  generate the checksum of a file, or a manifest of the checksums of many files
+    -  verify the files listed in a manifest
     -  generate the C header file and source of any of the algorithms below
 
 It supports the following CRC algorithms:
@@ -37,6 +38,11 @@ It supports the following CRC algorithms:
                         augmented message
     -  bit-by-bit-fast  a variation of the simple bit-by-bit algorithm
     -  table-driven     the standard table driven algorithm
+    -  folding          reduces large blocks of the message at once; used in
+                        Python only, by default for --check-file
+    -  clmul            carry-less-multiply: the table-driven algorithm,
+                        accelerated in the generated C code with the PCLMULQDQ
+                        instruction
 """
 
 from __future__ import print_function
@@ -44,12 +50,27 @@ from pycrc import __version__
 from pycrc.opt import Options
 from pycrc.algorithms import Crc
 import pycrc.codegen as cg
+import pycrc.cache as cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import binascii
+import collections
+import contextlib
+import fnmatch
+import json
+import mmap
+import os
+import shlex
+import shutil
+import stat
 import sys
+import time
 
 progname = "pycrc"
 url = 'https://pycrc.org'
 
+# Do not start worker processes for ranges smaller than this, it's not worth the overhead.
+min_job_size = 1 << 20
+
 
 def print_parameters(opt):
     """
@@ -58,6 +79,17 @@ def print_parameters(opt):
     return str(cg.ParamBlock(opt, ''))
 
 
+def crc_from_options(opt):
+    """
+    Return a Crc object with the parameters given in opt.
+    """
+    return Crc(
+        width=opt.width, poly=opt.poly,
+        reflect_in=opt.reflect_in, xor_in=opt.xor_in,
+        reflect_out=opt.reflect_out, xor_out=opt.xor_out,
+        table_idx_width=opt.tbl_idx_width, slice_by=opt.slice_by)
+
+
 def check_string(opt):
     """
     Return the calculated CRC sum of a string.
@@ -69,11 +101,7 @@ def check_string(opt):
     if opt.algorithm == 0:
         opt.algorithm = opt.algo_bit_by_bit | opt.algo_bit_by_bit_fast | opt.algo_table_driven
 
-    alg = Crc(
-        width=opt.width, poly=opt.poly,
-        reflect_in=opt.reflect_in, xor_in=opt.xor_in,
-        reflect_out=opt.reflect_out, xor_out=opt.xor_out,
-        table_idx_width=opt.tbl_idx_width)
+    alg = crc_from_options(opt)
 
     crc = None
     if opt.algorithm & opt.algo_bit_by_bit:
@@ -85,8 +113,6 @@ def check_string(opt):
         error |= crc is not None and bbf_crc != crc
         crc = bbf_crc
     if opt.algorithm & opt.algo_table_driven:
-        # no point making the python implementation slower by using less than 8 bits as index.
-        opt.tbl_idx_width = 8
         tbl_crc = alg.table_driven(opt.check_string)
         error |= crc is not None and tbl_crc != crc
         crc = tbl_crc
@@ -124,61 +150,311 @@ def check_hexstring(opt):
     return check_string(opt)
 
 
-def crc_file_update(alg, register, check_bytes):
+def file_engine(opt, alg):
+    """
+    Return the update function used to calculate the CRC of a file.
+    The folding algorithm, which is the fastest for large blocks of data, is
+    used unless an algorithm has been explicitly requested with the
+    --algorithm option.
     """
-    Update the CRC using the bit-by-bit-fast CRC algorithm.
+    all_algorithms = opt.algo_bit_by_bit | opt.algo_bit_by_bit_fast | opt.algo_table_driven
+    if opt.algorithm in set([opt.algo_none, all_algorithms]):
+        return alg.folding_update
+    if opt.algorithm & opt.algo_table_driven:
+        return alg.table_driven_update
+    return alg.bit_by_bit_fast_update
+
+
+def file_blocks(f, block_size, offset=0, length=None):
     """
-    # If the input data is a string, convert to bytes.
-    if isinstance(check_bytes, str):
-        check_bytes = bytearray(check_bytes, 'utf_8')
+    Yield the content of the open binary file f as memoryview blocks of at most
+    block_size bytes, starting at offset and for length bytes, or up to the end
+    of the file if length is None.
+    Regular files are memory-mapped; other files, such as pipes and stdin, are
+    read into a single buffer which is reused for every block. Therefore a
+    block is only valid until the next one is requested.
+    """
+    try:
+        mm = None
+        if stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Empty files and file systems without mmap support are streamed.
+        mm = None
+
+    if mm is not None:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        with mm, memoryview(mm) as view:
+            end = len(view) if length is None else min(len(view), offset + length)
+            for i in range(offset, end, block_size):
+                with view[i:min(i + block_size, end)] as block:
+                    yield block
+        return
+
+    if offset:
+        f.seek(offset)
+    with memoryview(bytearray(block_size)) as view:
+        while length is None or length > 0:
+            with view[:block_size if length is None else min(block_size, length)] as buf:
+                size = f.readinto(buf)
+            if not size:
+                break
+            with view[:size] as block:
+                yield block
+            if length is not None:
+                length -= size
+
+
+def open_file(filename):
+    """
+    Open a file for reading in binary mode; "-" is the standard input.
+    """
+    if filename == '-':
+        return contextlib.nullcontext(sys.stdin.buffer)
+    return open(filename, 'rb')
+
+
+def file_crc(alg, crc_update, filename, block_size, offset=0, length=None):
+    """
+    Calculate the CRC of length bytes of a file, starting at offset, using the
+    update function crc_update of alg.
+    If length is None, the CRC is calculated up to the end of the file.
+    """
+    # Always use the xor_in value unreflected
+    # As in the rocksoft reference implementation
+    register = alg.direct_init
 
-    for octet in check_bytes:
-        if alg.reflect_in:
-            octet = alg.reflect(octet, 8)
-        for j in range(8):
-            bit = register & alg.msb_mask
-            register <<= 1
-            if octet & (0x80 >> j):
-                bit ^= alg.msb_mask
-            if bit:
-                register ^= alg.poly
-        register &= alg.mask
-    return register
+    with open_file(filename) as f:
+        for block in file_blocks(f, block_size, offset, length):
+            register = crc_update(register, block)
+    return alg.finalize(register)
+
+
+def check_file_range(opt, offset=0, length=None):
+    """
+    Calculate the CRC of length bytes of the file given with --check-file,
+    starting at offset.
+    If length is None, the CRC is calculated up to the end of the file.
+    """
+    alg = crc_from_options(opt)
+    return file_crc(alg, file_engine(opt, alg), opt.check_file, opt.block_size, offset, length)
 
 
 def check_file(opt):
     """
     Calculate the CRC of a file.
-    This algorithm uses the table_driven CRC algorithm.
+    This function uses the folding CRC algorithm by default, unless an
+    algorithm has been requested with --algorithm.
+    With --jobs, the file is split in ranges which are calculated in parallel
+    and the partial CRCs are combined.
     """
     if opt.undefined_crc_parameters:
         sys.stderr.write("{0:s}: error: undefined parameters\n".format(progname))
         sys.exit(1)
-    alg = Crc(
-        width=opt.width, poly=opt.poly,
-        reflect_in=opt.reflect_in, xor_in=opt.xor_in,
-        reflect_out=opt.reflect_out, xor_out=opt.xor_out,
-        table_idx_width=opt.tbl_idx_width)
-
-    # Always use the xor_in value unreflected
-    # As in the rocksoft reference implementation
-    register = opt.xor_in
 
     try:
-        with open(opt.check_file, 'rb') as f:
-            check_bytes = bytearray(f.read(4096))
-            while check_bytes != b"":
-                register = crc_file_update(alg, register, check_bytes)
-                check_bytes = bytearray(f.read(4096))
+        jobs = 1
+        if opt.jobs > 1 and opt.check_file != '-':
+            size = os.path.getsize(opt.check_file)
+            jobs = max(1, min(opt.jobs, size // min_job_size))
+        if jobs == 1:
+            return check_file_range(opt)
+
+        range_size = (size + jobs - 1) // jobs
+        offsets = range(0, size, range_size)
+        lengths = [min(range_size, size - offset) for offset in offsets]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            crcs = list(executor.map(check_file_range, [opt] * len(offsets), offsets, lengths))
     except IOError:
         sys.stderr.write(
             "{0:s}: error: can't open file {1:s}\n".format(progname, opt.check_file))
         sys.exit(1)
 
-    if opt.reflect_out:
-        register = alg.reflect(register, opt.width)
-    register = register ^ opt.xor_out
-    return register
+    alg = crc_from_options(opt)
+    crc = crcs[0]
+    for crc2, len2 in zip(crcs[1:], lengths[1:]):
+        crc = alg.combine(crc, crc2, len2)
+    return crc
+
+
+def list_files(opt):
+    """
+    Return the files to check, in a deterministic order.
+    Files given on the command line are returned as given; directories are
+    replaced by the files they contain, sorted by name and filtered by the
+    --include and --exclude patterns. Sub-directories are only searched with
+    the --recursive option.
+    """
+    def selected(name):
+        if opt.include_patterns and not any(fnmatch.fnmatch(name, pat) for pat in opt.include_patterns):
+            return False
+        return not any(fnmatch.fnmatch(name, pat) for pat in opt.exclude_patterns)
+
+    files = []
+    for path in opt.check_files:
+        if path == '-' or not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            if not opt.recursive:
+                dirs.clear()
+            files.extend(os.path.join(root, name) for name in sorted(names)
+                         if selected(name) and os.path.isfile(os.path.join(root, name)))
+    return files
+
+
+def check_files(opt):
+    """
+    Calculate the CRC of all files given with --check-file.
+    Return a list of (filename, crc) tuples in the order of list_files(); crc
+    is None if the file could not be read.
+    The model and the table are built once and shared by the worker threads.
+    """
+    if opt.undefined_crc_parameters:
+        sys.stderr.write("{0:s}: error: undefined parameters\n".format(progname))
+        sys.exit(1)
+    alg = crc_from_options(opt)
+    crc_update = file_engine(opt, alg)
+    files = list_files(opt)
+
+    def crc_or_none(filename):
+        try:
+            return file_crc(alg, crc_update, filename, opt.block_size)
+        except IOError:
+            sys.stderr.write("{0:s}: error: can't open file {1:s}\n".format(progname, filename))
+            return None
+
+    with ThreadPoolExecutor(max_workers=opt.jobs) as executor:
+        return list(zip(files, executor.map(crc_or_none, files)))
+
+
+def format_manifest(opt, results):
+    """
+    Return the lines of a manifest for the (filename, crc) tuples in results,
+    either as "<crc>  <filename>" or as JSON lines. Files with errors are omitted.
+    """
+    digits = (opt.width + 3) // 4
+    lines = []
+    for filename, crc in results:
+        if crc is None:
+            continue
+        crc_str = "{0:#0{1:d}x}".format(crc, digits + 2)
+        if opt.manifest_format == 'json':
+            lines.append(json.dumps({"crc": crc_str, "file": filename}))
+        else:
+            lines.append("{0:s}  {1:s}".format(crc_str, filename))
+    return lines
+
+
+def write_manifest(opt):
+    """
+    Write the manifest of the files given with --check-file to stdout or to
+    the --output file. Return the number of files that could not be read.
+    """
+    results = check_files(opt)
+    out = format_manifest(opt, results)
+    if opt.output_file is None:
+        for line in out:
+            print(line)
+    else:
+        write_file(opt.output_file, "".join(line + "\n" for line in out))
+    return sum(1 for _, crc in results if crc is None)
+
+
+def read_manifest(filename):
+    """
+    Yield the (filename, crc) entries of a manifest as written by --check-file,
+    in text or JSON lines format. Empty lines and lines starting with # are ignored.
+    """
+    try:
+        with open(filename, encoding='utf-8') if filename != '-' else contextlib.nullcontext(sys.stdin) as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.rstrip('\r\n')
+                if line.strip() == '' or line.startswith('#'):
+                    continue
+                try:
+                    if line.startswith('{'):
+                        entry = json.loads(line)
+                        crc_str, check_file = entry['crc'], entry['file']
+                    else:
+                        crc_str, check_file = line.split(None, 1)
+                    yield check_file, int(crc_str, 16)
+                except (ValueError, KeyError, TypeError):
+                    sys.stderr.write(
+                        "{0:s}: error: {1:s}:{2:d}: invalid manifest line\n".format(progname, filename, lineno))
+                    sys.exit(1)
+    except IOError:
+        sys.stderr.write("{0:s}: error: can't open file {1:s}\n".format(progname, filename))
+        sys.exit(1)
+
+
+def bounded_map(executor, func, iterable, queue_size):
+    """
+    Yield (item, func(item)) for the items of iterable, in order, like
+    executor.map(). At most queue_size items are submitted ahead of the
+    result that is being returned, and the pending items are cancelled when the
+    generator is closed.
+    """
+    pending = collections.deque()
+    try:
+        for item in iterable:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= queue_size:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def verify_manifest(opt):
+    """
+    Check the files listed in the manifest given with --verify and print one
+    line per file, followed by a summary. Return the number of failed files.
+    The files are checked by --jobs threads; to keep the memory bounded, only
+    a few more files than threads are queued at any time.
+    With --fail-fast, no more files are checked after the first failure.
+    """
+    if opt.undefined_crc_parameters:
+        sys.stderr.write("{0:s}: error: undefined parameters\n".format(progname))
+        sys.exit(1)
+    alg = crc_from_options(opt)
+    crc_update = file_engine(opt, alg)
+
+    def crc_and_size(entry):
+        try:
+            return file_crc(alg, crc_update, entry[0], opt.block_size), os.path.getsize(entry[0])
+        except IOError:
+            return None, 0
+
+    checked = failed = total_size = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=opt.jobs) as executor:
+        results = bounded_map(executor, crc_and_size, read_manifest(opt.verify_file), 2 * opt.jobs)
+        for (check_file, expected_crc), (crc, size) in results:
+            checked += 1
+            total_size += size
+            if crc is None:
+                print("{0:s}: FAILED open or read".format(check_file))
+            elif crc != expected_crc:
+                print("{0:s}: FAILED".format(check_file))
+            else:
+                print("{0:s}: OK".format(check_file))
+                continue
+            failed += 1
+            if opt.fail_fast:
+                results.close()
+                break
+
+    elapsed = time.perf_counter() - start
+    print("{0:d} files checked, {1:d} failed, {2:d} bytes in {3:.3f} s ({4:.1f} MB/s)".format(
+        checked, failed, total_size, elapsed, total_size / 1e6 / elapsed if elapsed > 0 else 0.0))
+    return failed
 
 
 def write_file(filename, out_str):
@@ -194,6 +470,109 @@ def write_file(filename, out_str):
         sys.exit(1)
 
 
+def read_batch(filename):
+    """
+    Return the Options of every line of the batch specification file given
+    with --batch. Each line holds the options of one --generate call; empty
+    lines and comments starting with # are ignored. All lines are parsed
+    before any code is generated, so that an error in the file does not leave
+    a partial set of generated files behind.
+    """
+    opts = []
+    try:
+        with open(filename, encoding='utf-8') if filename != '-' else contextlib.nullcontext(sys.stdin) as f:
+            lines = list(f)
+    except IOError:
+        sys.stderr.write("{0:s}: error: can't open file {1:s}\n".format(progname, filename))
+        sys.exit(1)
+    for lineno, line in enumerate(lines, 1):
+        try:
+            argv = shlex.split(line, comments=True)
+            if len(argv) == 0:
+                continue
+            opt = Options(progname, __version__, url)
+            opt.parse(argv)
+        except (ValueError, SystemExit):
+            opt = None
+        if opt is None or opt.action not in set([
+                opt.action_generate_h, opt.action_generate_c, opt.action_generate_c_main,
+                opt.action_generate_table]):
+            sys.stderr.write(
+                "{0:s}: error: {1:s}:{2:d}: invalid batch line\n".format(progname, filename, lineno))
+            sys.exit(1)
+        opts.append(opt)
+    return opts
+
+
+def generate_code(opt):
+    """
+    Generate the source code selected by --generate. If an output file is
+    given, the code is written to it line by line as it is generated and None
+    is returned; otherwise the code is returned as a string.
+    With --cache-dir, the code is taken from the cache if it was generated
+    with the same options before, without building the code tree.
+    """
+    if opt.cache_dir is not None:
+        return generate_cached_code(opt)
+    code = cg.File(opt, '')
+    if opt.output_file is None:
+        return str(code)
+    try:
+        with open(opt.output_file, "w") as out_file:
+            code.write(out_file)
+    except IOError:
+        sys.stderr.write("{0:s}: error: cannot write to file {1:s}\n".format(progname, opt.output_file))
+        sys.exit(1)
+    return None
+
+
+def generate_cached_code(opt):
+    """
+    Generate the source code through the cache directory given with
+    --cache-dir. If the cache can't be used, the code is generated without it.
+    """
+    key = cache.cache_key(opt)
+    try:
+        cached_file = cache.open_entry(opt.cache_dir, key)
+        if cached_file is None:
+            cached_file = cache.store(opt.cache_dir, key, cg.File(opt, ''), opt.cache_size)
+    except OSError:
+        sys.stderr.write("{0:s}: warning: can't use the cache directory {1:s}\n".format(progname, opt.cache_dir))
+        opt.cache_dir = None
+        return generate_code(opt)
+    with cached_file:
+        if opt.output_file is None:
+            return cached_file.read()
+        try:
+            with open(opt.output_file, "w") as out_file:
+                shutil.copyfileobj(cached_file, out_file)
+        except IOError:
+            sys.stderr.write("{0:s}: error: cannot write to file {1:s}\n".format(progname, opt.output_file))
+            sys.exit(1)
+    return None
+
+
+def generate_batch(opt):
+    """
+    Generate the source code for every line of the batch specification file.
+    The CRC tables are cached, so outputs for the same model reuse them.
+    With --jobs, the files are generated and written by worker processes;
+    only the code for the standard output is passed back. Consecutive lines
+    are handed to the same worker, so that the header and the source of a
+    model, which are usually listed next to each other, share its tables.
+    """
+    opts = read_batch(opt.batch_file)
+    with contextlib.ExitStack() as stack:
+        if opt.jobs > 1 and len(opts) > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=opt.jobs))
+            outputs = executor.map(generate_code, opts, chunksize=max(1, len(opts) // (4 * opt.jobs)))
+        else:
+            outputs = map(generate_code, opts)
+        for out in outputs:
+            if out is not None:
+                print(out)
+
+
 def main():
     """
     Main function.
@@ -209,16 +588,21 @@ def main():
         crc = check_hexstring(opt)
         print("{0:#x}".format(crc))
     if opt.action == opt.action_check_file:
-        crc = check_file(opt)
-        print("{0:#x}".format(crc))
+        if opt.manifest_format is None and len(opt.check_files) == 1 and not os.path.isdir(opt.check_file):
+            crc = check_file(opt)
+            print("{0:#x}".format(crc))
+        elif write_manifest(opt) != 0:
+            return 1
+    if opt.action == opt.action_verify and verify_manifest(opt) != 0:
+        return 1
+    if opt.action == opt.action_batch:
+        generate_batch(opt)
     if opt.action in set([
             opt.action_generate_h, opt.action_generate_c, opt.action_generate_c_main,
             opt.action_generate_table]):
-        out = str(cg.File(opt, ''))
-        if opt.output_file is None:
+        out = generate_code(opt)
+        if out is not None:
             print(out)
-        else:
-            write_file(opt.output_file, out)
     return 0
 
 
@@ -56,6 +56,8 @@ class Options(object):
     action_generate_c = 0x05
     action_generate_c_main = 0x06
     action_generate_table = 0x07
+    action_verify = 0x08
+    action_batch = 0x09
 
     def __init__(self, progname='pycrc', version='unknown', url='unknown'):
         self.program_name = progname
@@ -72,6 +74,10 @@ class Options(object):
         self.tbl_idx_width = 8
         self.tbl_width = 1 << self.tbl_idx_width
         self.slice_by = 1
+        self.clmul = False
+        self.combine = False
+        self.jobs = 1
+        self.block_size = 1 << 20
         self.verbose = False
         self.check_string = "123456789"
         self.msb_mask = None
@@ -82,8 +88,19 @@ class Options(object):
         self.crc_type = None
         self.include_files = []
         self.output_file = None
+        self.timestamp = True
+        self.cache_dir = None
+        self.cache_size = 1 << 24
         self.action = self.action_check_str
         self.check_file = None
+        self.check_files = []
+        self.recursive = False
+        self.include_patterns = []
+        self.exclude_patterns = []
+        self.manifest_format = None
+        self.verify_file = None
+        self.batch_file = None
+        self.fail_fast = False
         self.c_std = None
         self.undefined_crc_parameters = False
 
@@ -102,9 +119,18 @@ To calculate the checksum of a string or hexadecimal data:
 To calculate the checksum of a file:
     python %prog [model] --check-file filename
 
+To write a manifest with the checksums of several files and directories:
+    python %prog [model] --recursive --check-file filename [filename...]
+
+To check the files listed in a manifest:
+    python %prog [model] --verify manifest
+
 To generate the C source code and write it to filename:
     python %prog [model] --generate c -o filename
 
+To generate the source code for each line of a specification file:
+    python %prog --batch specfile
+
 The model can be defined either with the --model switch or by specifying each
 of the following parameters:
     --width --poly --reflect-in --xor-in --reflect-out --xor-out"""
@@ -129,14 +155,52 @@ of the following parameters:
                 metavar="STRING")
         parser.add_option(
                 "--check-file",
-                action="store", type="string", dest="check_file",
-                help="calculate the checksum of a file",
+                action="append", type="string", dest="check_file",
+                help="calculate the checksum of a file; use - to read from the standard input. "
+                "Further files and directories can be given as arguments or with more --check-file options",
+                metavar="FILE")
+        parser.add_option(
+                "-r", "--recursive",
+                action="store_true", dest="recursive", default=False,
+                help="with --check-file, include the files in sub-directories")
+        parser.add_option(
+                "--include",
+                action="append", type="string", dest="include_patterns",
+                help="with --check-file, only check the files found in the given directories whose file name matches PATTERN; "
+                "can be specified multiple times",
+                metavar="PATTERN")
+        parser.add_option(
+                "--exclude",
+                action="append", type="string", dest="exclude_patterns",
+                help="with --check-file, skip the files found in the given directories whose file name matches PATTERN; "
+                "can be specified multiple times",
+                metavar="PATTERN")
+        parser.add_option(
+                "--manifest-format",
+                action="store", type="string", dest="manifest_format",
+                help="with --check-file, print the checksums as a manifest; "
+                "choose the format from {text, json}",
+                metavar="FORMAT")
+        parser.add_option(
+                "--verify",
+                action="store", type="string", dest="verify_file",
+                help="check the files listed in the manifest FILE, as written by --check-file",
                 metavar="FILE")
+        parser.add_option(
+                "--fail-fast",
+                action="store_true", dest="fail_fast", default=False,
+                help="with --verify, stop at the first file that fails")
         parser.add_option(
                 "--generate",
                 action="store", type="string", dest="generate", default=None,
                 help="generate C source code; choose the type from {h, c, c-main, table}",
                 metavar="CODE")
+        parser.add_option(
+                "--batch",
+                action="store", type="string", dest="batch_file",
+                help="generate the source code for each line of FILE; every line holds the options of "
+                "one --generate call, usually with -o",
+                metavar="FILE")
         parser.add_option(
                 "--std",
                 action="store", type="string", dest="c_std", default="C99",
@@ -146,7 +210,7 @@ of the following parameters:
                 "--algorithm",
                 action="store", type="string", dest="algorithm", default="all",
                 help="choose an algorithm from "
-                "{bit-by-bit, bbb, bit-by-bit-fast, bbf, table-driven, tbl, all}",
+                "{bit-by-bit, bbb, bit-by-bit-fast, bbf, table-driven, tbl, carry-less-multiply, clmul, all}",
                 metavar="ALGO")
         parser.add_option(
                 "--model",
@@ -188,11 +252,26 @@ of the following parameters:
                 action="store", type="int", dest="slice_by",
                 help="read NUM bytes at a time from the input. NUM must be one of the values {4, 8, 16}",
                 metavar="NUM")
+        parser.add_option(
+                "--jobs",
+                action="store", type="int", dest="jobs",
+                help="use NUM worker processes to calculate the checksum of a large file "
+                "or to generate the files of --batch",
+                metavar="NUM")
+        parser.add_option(
+                "--block-size",
+                action="store", type="int", dest="block_size",
+                help="calculate the checksum of a file in blocks of NUM bytes",
+                metavar="NUM")
         parser.add_option(
                 "--table-idx-width",
                 action="store", type="int", dest="table_idx_width",
-                help="use NUM bits to index the CRC table; NUM must be one of the values {1, 2, 4, 8}",
+                help="use NUM bits to index the CRC table; NUM must be one of the values {1, 2, 4, 8, 16}",
                 metavar="NUM")
+        parser.add_option(
+                "--combine",
+                action="store_true", dest="combine", default=False,
+                help="when generating source code, add a function to combine the checksums of two messages")
         parser.add_option(
                 "--force-poly",
                 action="store_true", dest="force_poly", default=False,
@@ -213,10 +292,26 @@ of the following parameters:
                 help="when generating source code, include also FILE as header file; "
                 "can be specified multiple times",
                 metavar="FILE")
+        parser.add_option(
+                "--no-timestamp",
+                action="store_false", dest="timestamp", default=True,
+                help="when generating source code, do not write the date and time of the generation into the file")
+        parser.add_option(
+                "--cache-dir",
+                action="store", type="string", dest="cache_dir",
+                help="when generating source code, keep the generated files in the cache directory DIR and "
+                "reuse them if the options are the same; requires --no-timestamp",
+                metavar="DIR")
+        parser.add_option(
+                "--cache-size",
+                action="store", type="int", dest="cache_size",
+                help="limit the size of the --cache-dir directory to NUM bytes (default: 16 MiB); "
+                "the least recently used files are removed first",
+                metavar="NUM")
         parser.add_option(
                 "-o", "--output",
                 action="store", type="string", dest="output_file",
-                help="write the generated code to file instead to stdout",
+                help="write the generated code or the manifest to file instead to stdout",
                 metavar="FILE")
 
         options, args = parser.parse_args(argv)
@@ -257,11 +352,16 @@ of the following parameters:
             undefined_params.append("--xor-out")
 
         if options.table_idx_width is not None:
-            if options.table_idx_width in set((1, 2, 4, 8)):
+            if options.table_idx_width in set((1, 2, 4, 8, 16)):
                 self.tbl_idx_width = options.table_idx_width
                 self.tbl_width = 1 << options.table_idx_width
             else:
                 self.__error(f"unsupported table-idx-width {options.table_idx_width}")
+            if self.tbl_idx_width == 16 and options.generate is not None:
+                if self.width is None or self.width < 16:
+                    self.__error("table-idx-width=16 is only implemented for width >= 16")
+                if self.reflect_in is None:
+                    self.__error("table-idx-width=16 is only implemented for a defined ReflectIn")
 
         if self.poly is not None and self.poly % 2 == 0 and not options.force_poly:
             self.__error("even polinomials are not allowed by default. Use --force-poly to override this.")
@@ -293,6 +393,16 @@ of the following parameters:
         else:
             self.undefined_crc_parameters = False
 
+        if options.jobs is not None:
+            if options.jobs < 1:
+                self.__error(f"unsupported number of jobs {options.jobs}")
+            self.jobs = options.jobs
+
+        if options.block_size is not None:
+            if options.block_size < 1:
+                self.__error(f"unsupported block size {options.block_size}")
+            self.block_size = options.block_size
+
         if options.slice_by is not None:
             if options.slice_by in set((4, 8, 16)):
                 self.slice_by = options.slice_by
@@ -302,19 +412,12 @@ of the following parameters:
                 self.__error("slice-by is only implemented for fully defined models")
             if self.tbl_idx_width != 8:
                 self.__error("slice-by is only implemented for table-idx-width=8")
+            # The Python implementation handles all models; the restrictions below apply to the generated code.
             # FIXME tp: Fix corner cases and disable the following tests
-            if self.width < 8:
-                self.__warning(f"disabling slice-by for width {self.width}")
-                self.slice_by = 1
-            if self.width < 16:
-                self.__warning(f"disabling slice-by for width {self.width}")
-                self.slice_by = 1
-            if self.width > 32:
-                self.__warning(f"disabling slice-by for width {self.width}")
-                self.slice_by = 1
-            if not self.reflect_in:
-                self.__warning("disabling slice-by for non-reflected algorithm")
-                self.slice_by = 1
+            if options.generate is not None:
+                if self.width < 8:
+                    self.__warning(f"disabling slice-by for width {self.width}")
+                    self.slice_by = 1
 # FIXME tp: reintroduce this?
 #            if self.width % 8 != 0:
 #                self.__error("slice-by is only implemented for width multiples of 8")
@@ -331,9 +434,27 @@ of the following parameters:
                 self.algorithm |= self.algo_bit_by_bit_fast
             if alg in set(["table-driven", "tbl", "all"]):
                 self.algorithm |= self.algo_table_driven
+            if alg in set(["carry-less-multiply", "clmul"]):
+                # The generated code falls back to the table-driven algorithm.
+                self.algorithm |= self.algo_table_driven
+                self.clmul = True
             if self.algorithm == 0:
                 self.__error(f"unknown algorithm {options.algorithm}")
 
+        if self.clmul and options.generate is not None:
+            if self.undefined_crc_parameters:
+                self.__error("clmul is only implemented for fully defined models")
+            if self.c_std == "C89":
+                self.__error("--algorithm clmul not supported for C89")
+            if self.width < 8:
+                self.__warning(f"disabling clmul for width {self.width}")
+                self.clmul = False
+
+        self.combine = options.combine
+        if self.combine and options.generate is not None:
+            if self.undefined_crc_parameters:
+                self.__error("--combine is only implemented for fully defined models")
+
         if options.symbol_prefix is not None:
             self.symbol_prefix = options.symbol_prefix
         if options.include_files is not None:
@@ -342,6 +463,11 @@ of the following parameters:
             self.crc_type = options.crc_type
         if options.output_file is not None:
             self.output_file = options.output_file
+        self.timestamp = options.timestamp
+        if options.cache_size is not None:
+            if options.cache_size < 1:
+                self.__error(f"unsupported cache size {options.cache_size}")
+            self.cache_size = options.cache_size
         op_count = 0
         if options.check_string is not None:
             self.action = self.action_check_str
@@ -353,7 +479,25 @@ of the following parameters:
             op_count += 1
         if options.check_file is not None:
             self.action = self.action_check_file
-            self.check_file = options.check_file
+            self.check_files = options.check_file + args
+            self.check_file = self.check_files[0]
+            self.recursive = options.recursive
+            self.include_patterns = options.include_patterns or []
+            self.exclude_patterns = options.exclude_patterns or []
+            if options.manifest_format is not None:
+                self.manifest_format = options.manifest_format.lower()
+                if self.manifest_format not in set(["text", "json"]):
+                    self.__error(f"unknown manifest format {options.manifest_format}")
+            args = []
+            op_count += 1
+        if options.verify_file is not None:
+            self.action = self.action_verify
+            self.verify_file = options.verify_file
+            self.fail_fast = options.fail_fast
+            op_count += 1
+        if options.batch_file is not None:
+            self.action = self.action_batch
+            self.batch_file = options.batch_file
             op_count += 1
         if options.generate is not None:
             arg = options.generate.lower()
@@ -378,12 +522,6 @@ of the following parameters:
                     [self.algo_bit_by_bit, self.algo_bit_by_bit_fast, self.algo_table_driven]):
                 self.__error("select an algorithm to be used in the generated file. "
                              "(Hint: use the --algorithm option.)")
-        else:
-            if self.tbl_idx_width != 8:
-                self.__warning("reverting to Table Index Width = 8 "
-                               "for internal CRC calculation")
-                self.tbl_idx_width = 8
-                self.tbl_width = 1 << options.table_idx_width
         if op_count == 0:
             self.action = self.action_check_str
         if op_count > 1:
@@ -392,8 +530,15 @@ of the following parameters:
         if len(args) != 0:
             self.__error("unrecognized argument(s): {0:s}".format(" ".join(args)))
 
+        if options.cache_dir is not None and options.generate is not None:
+            # A file with the date and time of the generation can't be reused.
+            if self.timestamp and self.action != self.action_generate_table:
+                self.__warning("--cache-dir requires --no-timestamp; not using the cache")
+            else:
+                self.cache_dir = options.cache_dir
+
         def_params_acts = (self.action_check_str, self.action_check_hex_str,
-                           self.action_check_file, self.action_generate_table)
+                           self.action_check_file, self.action_verify, self.action_generate_table)
         if self.undefined_crc_parameters and self.action in set(def_params_acts):
             undefined_params_str = ", ".join(undefined_params)
             self.__error(f"undefined parameters: Add {undefined_params_str} or use --model")
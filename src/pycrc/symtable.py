@@ -98,8 +98,15 @@ class SymbolTable:
         self.crc_init_function = self._opt.symbol_prefix + 'init'
         self.crc_update_function = self._opt.symbol_prefix + 'update'
         self.crc_finalize_function = self._opt.symbol_prefix + 'finalize'
+        self.crc_clmul_fold_function = self._opt.symbol_prefix + 'clmul_fold'
+        self.crc_clmul_fold_block_function = self._opt.symbol_prefix + 'clmul_fold_block'
+        self.crc_combine_function = self._opt.symbol_prefix + 'combine'
+        self.crc_combine_mulmod_function = self._opt.symbol_prefix + 'combine_mulmod'
 
         self.crc_init_value = _get_init_value(self._opt)
+        self.crc_clmul_k16 = _get_clmul_constants(self._opt, 16) if self._opt.clmul else None
+        self.crc_clmul_k64 = _get_clmul_constants(self._opt, 64) if self._opt.clmul else None
+        self.crc_combine_constants = _get_combine_constants(self._opt) if self._opt.combine else None
         self._crc_table_init = None
 
     @property
@@ -148,6 +155,8 @@ def _pretty_algorithm(opt):
         return 'bit-by-bit'
     elif opt.algorithm == opt.algo_bit_by_bit_fast:
         return 'bit-by-bit-fast'
+    elif opt.algorithm == opt.algo_table_driven and opt.clmul:
+        return 'carry-less-multiply'
     elif opt.algorithm == opt.algo_table_driven:
         return 'table-driven'
     else:
@@ -252,40 +261,39 @@ def _get_init_value(opt):
     return _pretty_hex(init, opt.width)
 
 
-def _get_simple_table(opt, crc_tbl, values_per_line, format_width, indent):
+def _get_simple_table(crc_tbl, values_per_line, format_width, indent):
     """
-    Get one CRC table, formatted as string with appropriate indenting and
-    line breaks.
+    Return the lines of one CRC table, with appropriate indenting and a comma
+    after every value but the last one.
     """
-    out = ""
-    for i in range(opt.tbl_width):
-        if i % values_per_line == 0:
-            out += " " * indent
-        tbl_val = _pretty_hex(crc_tbl[i], format_width)
-        if i == (opt.tbl_width - 1):
-            out += "{0:s}".format(tbl_val)
-        elif i % values_per_line == (values_per_line - 1):
-            out += "{0:s},\n".format(tbl_val)
-        else:
-            out += "{0:s}, ".format(tbl_val)
-    return out
-
-
-def _get_table_init(opt):       # TODO: change to return a list
+    # Format a whole line with one call, instead of calling _pretty_hex() for every value.
+    value_format = '{{:#0{0:d}x}}'.format((format_width + 3) // 4 + 2)
+    line_format = ' ' * indent + ', '.join([value_format] * values_per_line) + ','
+    lines = [line_format.format(*crc_tbl[i:i + values_per_line])
+             for i in range(0, len(crc_tbl) - values_per_line + 1, values_per_line)]
+    rest = len(crc_tbl) % values_per_line
+    if rest:
+        lines.append(' ' * indent + ', '.join([value_format] * rest).format(*crc_tbl[-rest:]) + ',')
+    lines[-1] = lines[-1][:-1]
+    return lines
+
+
+def _get_table_init(opt):
     """
-    Return the precalculated CRC table for the table_driven implementation.
+    Return the precalculated CRC table for the table_driven implementation,
+    as a list of lines which form a C initialiser.
     """
     if opt.algorithm != opt.algo_table_driven:
-        return "0"
+        return ["0"]
     if opt.width is None or opt.poly is None or opt.reflect_in is None:
-        return "0"
+        return ["0"]
     crc = Crc(
         width=opt.width, poly=opt.poly,
         reflect_in=opt.reflect_in,
         xor_in=0, reflect_out=False, xor_out=0,     # set unimportant variables to known values
         table_idx_width=opt.tbl_idx_width,
         slice_by=opt.slice_by)
-    crc_tbl = crc.gen_table()
+    crc_tbl = crc.tbl
     if opt.width > 32:
         values_per_line = 4
     elif opt.width >= 16:
@@ -294,20 +302,67 @@ def _get_table_init(opt):       # TODO: change to return a list
         values_per_line = 16
     format_width = max(opt.width, 8)
     if opt.slice_by == 1:
-        indent = 4
-    else:
-        indent = 8
+        return ['{'] + _get_simple_table(crc_tbl[0], values_per_line, format_width, 4) + ['}']
 
-    out = [''] * opt.slice_by
+    out = ['{']
     for i in range(opt.slice_by):
-        out[i] = _get_simple_table(opt, crc_tbl[i], values_per_line, format_width, indent)
-    fixed_indent = ' ' * (indent - 4)
-    out = '{0:s}{{\n'.format(fixed_indent) + \
-        '\n{0:s}}},\n{0:s}{{\n'.format(fixed_indent).join(out) + \
-        '\n{0:s}}}'.format(fixed_indent)
-    if opt.slice_by == 1:
-        return out
-    return '{\n' + out + '\n}'
+        out.append('    {')
+        out += _get_simple_table(crc_tbl[i], values_per_line, format_width, 8)
+        out.append('    },' if i < opt.slice_by - 1 else '    }')
+    out.append('}')
+    return out
+
+
+def _get_clmul_constants(opt, distance):
+    """
+    Return the high and the low 64 bits of the constants that fold a 128-bit
+    block of data distance octets forward with carry-less multiplications.
+
+    For non-reflected algorithms, the high half of a block is multiplied by
+    x^(8 * distance + 64) mod Poly and the low half by x^(8 * distance) mod Poly.
+    For reflected algorithms the constants are reflected and swapped, and their
+    exponent is one less, because the product of two reflected 64-bit values is
+    shifted by one bit.
+    """
+    crc = Crc(
+        width=opt.width, poly=opt.poly,
+        reflect_in=opt.reflect_in, xor_in=opt.xor_in,
+        reflect_out=opt.reflect_out, xor_out=opt.xor_out)
+    if opt.reflect_in:
+        return (_pretty_hex(crc.reflect(crc.xpow_mod(8 * distance - 1), 64), 64),
+                _pretty_hex(crc.reflect(crc.xpow_mod(8 * distance + 63), 64), 64))
+    return (_pretty_hex(crc.xpow_mod(8 * distance + 64), 64),
+            _pretty_hex(crc.xpow_mod(8 * distance), 64))
+
+
+def _get_combine_constants(opt):
+    """
+    Return the constants of the combine function as a dictionary of pretty
+    hexadecimal strings, in the bit order of the final CRC value.
+
+    xpow8 holds x^(8 * 2^k) mod Poly for k = 0..63, so that x^(8 * n) mod Poly
+    can be assembled from the set bits of n. one is the polynomial 1 and poly
+    the generator polynomial, both reflected for reflected algorithms. xor is
+    the value xor_out ^ init, which cancels the contribution of xor_in and
+    xor_out to the first CRC value.
+    """
+    crc = Crc(
+        width=opt.width, poly=opt.poly,
+        reflect_in=opt.reflect_in, xor_in=opt.xor_in,
+        reflect_out=opt.reflect_out, xor_out=opt.xor_out)
+
+    def reflect(value):
+        return crc.reflect(value, opt.width) if opt.reflect_out else value
+
+    xpow8 = [crc.xpow_mod(8)]
+    for dummy_k in range(63):
+        xpow8.append(crc.mulmod(xpow8[-1], xpow8[-1]))
+    return {
+        'xpow8': [_pretty_hex(reflect(value), opt.width) for value in xpow8],
+        'one': _pretty_hex(reflect(1), opt.width),
+        'poly': _pretty_hex(reflect(opt.poly), opt.width),
+        'xor': _pretty_hex(opt.xor_out ^ reflect(opt.xor_in), opt.width),
+    }
 
 
 def _tbl_shift(opt):
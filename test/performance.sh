@@ -15,24 +15,24 @@ tmpdir=`mktemp -t -d pycrc-perf-XXXXXXXX`
 
 model=crc-32
 
-prefix=bbb
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c --algo bit-by-bit
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h --algo bit-by-bit
-prefix=bbf
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h --algo bit-by-bit-fast
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c --algo bit-by-bit-fast
-prefix=tbl
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h --algo table-driven
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c --algo table-driven
-prefix=tb4
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h --algo table-driven --table-idx-width 4
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c --algo table-driven --table-idx-width 4
-prefix=sb4
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h --algo table-driven --slice-by 4
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c --algo table-driven --slice-by 4
-prefix=sb16
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h --algo table-driven --slice-by 16
-$PYCRC --model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c --algo table-driven --slice-by 16
+print_spec() {
+    prefix=$1
+    shift
+    echo "--model $model --symbol-prefix crc_${prefix}_ --generate h -o $tmpdir/crc_$prefix.h $*"
+    echo "--model $model --symbol-prefix crc_${prefix}_ --generate c -o $tmpdir/crc_$prefix.c $*"
+}
+
+{
+    print_spec bbb --algo bit-by-bit
+    print_spec bbf --algo bit-by-bit-fast
+    print_spec tbl --algo table-driven
+    print_spec tb4 --algo table-driven --table-idx-width 4
+    print_spec tb16 --algo table-driven --table-idx-width 16
+    print_spec clm --algo carry-less-multiply
+    print_spec sb4 --algo table-driven --slice-by 4
+    print_spec sb16 --algo table-driven --slice-by 16
+} > $tmpdir/batch.spec
+$PYCRC --batch $tmpdir/batch.spec
 
 
 print_main() {
@@ -41,8 +41,10 @@ cat <<EOF
 #include "crc_bbf.h"
 #include "crc_tbl.h"
 #include "crc_tb4.h"
+#include "crc_tb16.h"
 #include "crc_sb4.h"
 #include "crc_sb16.h"
+#include "crc_clm.h"
 #include <stdio.h>
 #include <stdbool.h>
 #include <stdlib.h>
@@ -58,8 +60,10 @@ void test_bbb(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock
 void test_bbf(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
 void test_tbl(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
 void test_tb4(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
+void test_tb16(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
 void test_sb4(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
 void test_sb16(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
+void test_clm(unsigned char *buf, size_t buf_len, size_t num_runs, clock_t clock_per_sec);
 
 /**
  * Print results.
@@ -108,12 +112,18 @@ int main(void)
     // table-driven idx4
     test_tb4(buf, sizeof(buf), NUM_RUNS / 2, clock_per_sec);
 
+    // table-driven idx16
+    test_tb16(buf, sizeof(buf), NUM_RUNS, clock_per_sec);
+
     // table-driven slice-by 4
     test_sb4(buf, sizeof(buf), NUM_RUNS, clock_per_sec);
 
     // table-driven slice-by 16
     test_sb16(buf, sizeof(buf), NUM_RUNS, clock_per_sec);
 
+    // carry-less multiply
+    test_clm(buf, sizeof(buf), NUM_RUNS, clock_per_sec);
+
     return 0;
 }
 EOF
@@ -153,8 +163,10 @@ print_routine "bit-by-bit" bbb >> $tmpdir/performance.c
 print_routine "bit-by-bit-fast" bbf >> $tmpdir/performance.c
 print_routine "table-driven" tbl >> $tmpdir/performance.c
 print_routine "table-driven idx4" tb4 >> $tmpdir/performance.c
+print_routine "table-driven idx16" tb16 >> $tmpdir/performance.c
 print_routine "table-driven sb4" sb4 >> $tmpdir/performance.c
 print_routine "table-driven sb16" sb16 >> $tmpdir/performance.c
+print_routine "carry-less-multiply" clm >> $tmpdir/performance.c
 
-cc -W -Wall -O3 -o $tmpdir/perf $tmpdir/crc_bbb.c $tmpdir/crc_bbf.c $tmpdir/crc_tbl.c $tmpdir/crc_tb4.c $tmpdir/crc_sb4.c $tmpdir/crc_sb16.c $tmpdir/performance.c
+cc -W -Wall -O3 -o $tmpdir/perf $tmpdir/crc_bbb.c $tmpdir/crc_bbf.c $tmpdir/crc_tbl.c $tmpdir/crc_tb4.c $tmpdir/crc_tb16.c $tmpdir/crc_sb4.c $tmpdir/crc_sb16.c $tmpdir/crc_clm.c $tmpdir/performance.c
 $tmpdir/perf
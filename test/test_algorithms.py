@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 
+import array
 import logging
+import pytest
 from src.pycrc.models import CrcModels
-from src.pycrc.algorithms import Crc
+from src.pycrc.algorithms import Crc, table_cache_info, table_cache_clear
 
 LOGGER = logging.getLogger(__name__)
 
@@ -11,14 +13,15 @@ def check_crc(algo, check_str, expected_crc=None):
     res_bbb = algo.bit_by_bit(check_str)
     res_bbf = algo.bit_by_bit_fast(check_str)
     res_tbl = algo.table_driven(check_str)
+    res_fold = algo.folding(check_str)
     LOGGER.info(f"Crc(width={algo.width:#x}, poly={algo.poly:#x}, "
                 f"reflect_in={algo.reflect_in:#x}, xor_in={algo.xor_in:#x}, "
                 f"reflect_out={algo.reflect_out:#x}, xor_out={algo.xor_out:#x}), "
                 f"expected_crc={expected_crc}, "
-                f"bbb={res_bbb:#x}, bbf={res_bbf:#x}, tbl={res_tbl:#x}")
+                f"bbb={res_bbb:#x}, bbf={res_bbf:#x}, tbl={res_tbl:#x}, fold={res_fold:#x}")
     if expected_crc is not None:
-        assert res_bbb == res_bbf == res_tbl == expected_crc
-    assert res_bbb == res_bbf == res_tbl
+        assert res_bbb == res_bbf == res_tbl == res_fold == expected_crc
+    assert res_bbb == res_bbf == res_tbl == res_fold
 
 
 def test_all_models_with_check_input():
@@ -64,3 +67,191 @@ def test_other_models():
                                        reflect_in=reflect_in, xor_in=xor_in,
                                        reflect_out=reflect_out, xor_out=xor_out)
                             check_crc(algo, check_str)
+
+
+def models_and_odd_widths():
+    """
+    Return a Crc object for every model, plus some widths below 8 and above 64 bits.
+    """
+    algos = []
+    for m in CrcModels().models:
+        algos.append(Crc(width=m['width'], poly=m['poly'],
+                         reflect_in=m['reflect_in'], xor_in=m['xor_in'],
+                         reflect_out=m['reflect_out'], xor_out=m['xor_out']))
+    for width in [3, 5, 65, 513]:
+        mask = ((1 << width) - 1)
+        for reflect_in in [0, 1]:
+            algos.append(Crc(width=width, poly=0x4c11db7 & mask,
+                             reflect_in=reflect_in, xor_in=0x5a5a5a5a & mask,
+                             reflect_out=not reflect_in, xor_out=0x1))
+    return algos
+
+
+def test_update_in_chunks():
+    """
+    Feed the data in chunks to the update functions.
+    """
+    data = bytes(range(256)) * 3
+    for algo in models_and_odd_widths():
+        expected_crc = algo.bit_by_bit(data)
+        for update in algo.bit_by_bit_fast_update, algo.table_driven_update, algo.folding_update:
+            reg = algo.direct_init
+            for i in range(0, len(data), 100):
+                reg = update(reg, data[i:i + 100])
+            assert algo.finalize(reg) == expected_crc
+
+
+def test_slice_by():
+    """
+    Compare the slice-by variants of the table-driven algorithm with bit-by-bit.
+    """
+    data = bytes(range(256)) + b"123456789"
+    for algo in models_and_odd_widths():
+        for slice_by in [4, 8, 16]:
+            algo_sb = Crc(width=algo.width, poly=algo.poly,
+                          reflect_in=algo.reflect_in, xor_in=algo.xor_in,
+                          reflect_out=algo.reflect_out, xor_out=algo.xor_out,
+                          slice_by=slice_by)
+            for check_str in data, data[:slice_by], data[:slice_by + 1], b"":
+                assert algo_sb.table_driven(check_str) == algo.bit_by_bit(check_str)
+
+
+def test_folding_long_input():
+    """
+    Compare the folding algorithm with the table-driven algorithm on an input of several blocks.
+    """
+    data = bytes(range(251)) * 1000
+    for algo in models_and_odd_widths()[::3]:
+        assert algo.folding(data) == algo.table_driven(data)
+
+
+def test_table_driven_batch():
+    """
+    Calculate the CRCs of a batch of messages of the same length.
+    """
+    for algo in models_and_odd_widths():
+        for length in 0, 1, 9, 20:
+            messages = [bytes((i * 7 + j) & 0xff for j in range(length)) for i in range(10)]
+            expected_crcs = [algo.bit_by_bit(msg) for msg in messages]
+            assert [int(crc) for crc in algo.table_driven_batch(messages)] == expected_crcs
+            assert [int(crc) for crc in algo.table_driven_batch([bytearray(msg) for msg in messages])] == expected_crcs
+        assert len(algo.table_driven_batch([])) == 0
+
+
+def test_table_driven_batch_numpy():
+    """
+    Calculate the CRCs of the rows of a numpy array.
+    """
+    numpy = pytest.importorskip("numpy")
+    data = numpy.arange(30 * 17, dtype=numpy.uint32).reshape(30, 17).astype(numpy.uint8)
+    for algo in models_and_odd_widths():
+        expected_crcs = [algo.bit_by_bit(bytes(row)) for row in data]
+        crcs = algo.table_driven_batch(data)
+        assert [int(crc) for crc in crcs] == expected_crcs
+        if algo.width <= 64:
+            assert isinstance(crcs, numpy.ndarray)
+
+
+def test_table_driven_batch_ragged():
+    """
+    Calculate the CRCs of a batch of messages of different lengths.
+    """
+    messages = [bytes((i * 7 + j) & 0xff for j in range(i % 13)) for i in range(40)]
+    buf = b"".join(messages)
+    offsets = [0]
+    for msg in messages:
+        offsets.append(offsets[-1] + len(msg))
+    for algo in models_and_odd_widths():
+        expected_crcs = [algo.bit_by_bit(msg) for msg in messages]
+        for crcs in [algo.table_driven_batch(messages),
+                     algo.table_driven_batch([memoryview(msg) for msg in messages]),
+                     algo.table_driven_batch(buf, offsets),
+                     algo.table_driven_batch(bytearray(buf), offsets)]:
+            assert [int(crc) for crc in crcs] == expected_crcs
+    with pytest.raises(ValueError):
+        algo.table_driven_batch(buf, [0, 2, 1])
+
+
+def test_table_idx_width():
+    """
+    Compare the table-driven algorithm with table index widths 1, 2, 4 and 16 with bit-by-bit.
+    """
+    data = bytes(range(256)) + b"123456789"
+    for algo in models_and_odd_widths():
+        for table_idx_width in [1, 2, 4, 16]:
+            algo_idx = Crc(width=algo.width, poly=algo.poly,
+                           reflect_in=algo.reflect_in, xor_in=algo.xor_in,
+                           reflect_out=algo.reflect_out, xor_out=algo.xor_out,
+                           table_idx_width=table_idx_width)
+            assert len(algo_idx.tbl[0]) == 1 << table_idx_width
+            for check_str in data, data[:1], data[:2], data[:3], b"":
+                assert algo_idx.table_driven(check_str) == algo.bit_by_bit(check_str)
+
+
+def test_crc_hash():
+    """
+    Calculate the CRC incrementally with the hashlib-like interface.
+    """
+    for m in CrcModels().models:
+        algo = Crc(width=m['width'], poly=m['poly'],
+                   reflect_in=m['reflect_in'], xor_in=m['xor_in'],
+                   reflect_out=m['reflect_out'], xor_out=m['xor_out'])
+        h = algo.new()
+        assert h.crcvalue == algo.table_driven(b"")
+        h.update(b"1234")
+        h_copy = h.copy()
+        h.update("56789")
+        assert h.crcvalue == m['check']
+        assert h.digest() == m['check'].to_bytes((m['width'] + 7) // 8, 'big')
+        assert int(h.hexdigest(), 16) == m['check']
+        assert h_copy.crcvalue == algo.table_driven(b"1234")
+        h_copy.update(b"5678")
+        assert h_copy.crcvalue == algo.table_driven(b"12345678")
+        assert h.new(b"123456789").crcvalue == m['check']
+        words = array.array('I', [0x04030201, 0x08070605])
+        assert h.new(words).crcvalue == algo.table_driven(words.tobytes())
+        assert h.new(memoryview(words)[1:]).crcvalue == algo.table_driven(words.tobytes()[words.itemsize:])
+
+
+def test_combine():
+    """
+    Combine the CRCs of two messages and compare with the CRC of the concatenated message.
+    """
+    data = bytes(range(256)) * 2 + b"123456789"
+    for algo in models_and_odd_widths() + [Crc(width=1, poly=1, reflect_in=False, xor_in=1,
+                                               reflect_out=False, xor_out=0)]:
+        for split in 0, 1, 9, 100, 256, len(data):
+            crc1 = algo.bit_by_bit(data[:split])
+            crc2 = algo.bit_by_bit(data[split:])
+            assert algo.combine(crc1, crc2, len(data) - split) == algo.bit_by_bit(data)
+
+
+def test_table_cache():
+    """
+    Crc objects with the same table parameters share the cached table.
+    """
+    table_cache_clear()
+    algo1 = Crc(width=32, poly=0x4c11db7, reflect_in=True, xor_in=0xffffffff, reflect_out=True, xor_out=0xffffffff)
+    info1 = table_cache_info()
+    algo2 = Crc(width=32, poly=0x4c11db7, reflect_in=True, xor_in=0, reflect_out=False, xor_out=0)
+    info2 = table_cache_info()
+    assert info2.hits > info1.hits and info2.misses == info1.misses
+    algo3 = Crc(width=32, poly=0x4c11db7, reflect_in=False, xor_in=0xffffffff, reflect_out=False, xor_out=0xffffffff)
+    info3 = table_cache_info()
+    assert info3.misses == info2.misses + 1 and info3.currsize == 2
+    assert algo1.tbl is algo2.tbl
+    assert algo1.tbl is not algo3.tbl
+    assert algo1.gen_table() == [list(algo1.tbl[0])]
+    table_cache_clear()
+    assert table_cache_info().currsize == 0
+
+
+def test_reflect():
+    """
+    Compare the table-based reflect function with a bit-by-bit reflection.
+    """
+    algo = Crc(width=16, poly=0x8005, reflect_in=True, xor_in=0, reflect_out=True, xor_out=0)
+    for width in [1, 3, 7, 8, 9, 16, 31, 32, 33, 64, 65, 513]:
+        for data in [0, 1, 0x5a5a5a5a, 0xdeadbeefcafe, (1 << 600) - 3]:
+            expected = int(format(data & ((1 << width) - 1), f"0{width:d}b")[::-1], 2)
+            assert algo.reflect(data, width) == expected
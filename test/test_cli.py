@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
+import json
 import logging
+import os
 import tempfile
 import subprocess
 from src.pycrc.models import CrcModels
+from src.pycrc.algorithms import Crc
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,20 +26,186 @@ class TestCli:
                 check_crc(args + ["--check-hexstring", ''.join([f"{i:02x}" for i in check_bytes])], expected_crc)
                 check_crc(args + ["--check-file", f.name], expected_crc)
 
+    def test_check_file_algorithms(self):
+        check_bytes = bytes(range(256)) * 33
+        with tempfile.NamedTemporaryFile(prefix="pycrc-test.") as f:
+            f.write(check_bytes)
+            f.flush()
+
+            for m in CrcModels().models:
+                algo = Crc(width=m['width'], poly=m['poly'],
+                           reflect_in=m['reflect_in'], xor_in=m['xor_in'],
+                           reflect_out=m['reflect_out'], xor_out=m['xor_out'])
+                expected_crc = algo.bit_by_bit_fast(check_bytes)
+                check_crc(["--model", m["name"], "--check-file", f.name], expected_crc)
+                for algorithm in ["tbl", "bbf"]:
+                    check_crc(["--model", m["name"], "--algorithm", algorithm, "--check-file", f.name], expected_crc)
+
+    def test_table_idx_width(self):
+        for name in ["crc-5", "crc-16", "crc-32", "xmodem"]:
+            expected_crc = CrcModels().get_params(name)["check"]
+            for table_idx_width in ["1", "2", "4", "16"]:
+                check_crc(["--model", name, "--algorithm", "tbl", "--table-idx-width", table_idx_width], expected_crc)
+
+    def test_check_file_jobs(self):
+        check_bytes = bytes(range(256)) * 12289
+        with tempfile.NamedTemporaryFile(prefix="pycrc-test.") as f:
+            f.write(check_bytes)
+            f.flush()
+
+            for name in ["crc-5", "crc-16", "crc-32", "crc-64-jones", "xmodem"]:
+                expected_crc = int(run_pycrc(["--model", name, "--check-file", f.name]), 16)
+                check_crc(["--model", name, "--check-file", f.name, "--jobs", "3"], expected_crc)
+
+    def test_check_file_blocks(self):
+        check_bytes = bytes(range(256)) * 33
+        with tempfile.NamedTemporaryFile(prefix="pycrc-test.") as f:
+            f.write(check_bytes)
+            f.flush()
+
+            for name in ["crc-5", "crc-32", "crc-64-jones", "xmodem"]:
+                expected_crc = int(run_pycrc(["--model", name, "--check-string", ""]), 16)
+                check_crc(["--model", name, "--check-file", "-"], expected_crc, input=b"")
+                expected_crc = int(run_pycrc(["--model", name, "--check-hexstring", check_bytes.hex()]), 16)
+                for block_size in ["1", "7", "4096"]:
+                    check_crc(["--model", name, "--check-file", f.name, "--block-size", block_size], expected_crc)
+                    check_crc(["--model", name, "--check-file", "-", "--block-size", block_size], expected_crc,
+                              input=check_bytes)
+
+    def test_check_file_manifest(self):
+        with tempfile.TemporaryDirectory(prefix="pycrc-test.") as d:
+            files = {"a.txt": b"123456789", "b.bin": b"", "sub/c.txt": b"abc", "sub/sub/d.txt": b"\xff" * 1000}
+            for name, content in files.items():
+                os.makedirs(os.path.dirname(os.path.join(d, name)), exist_ok=True)
+                with open(os.path.join(d, name), "wb") as f:
+                    f.write(content)
+            algo = Crc(width=32, poly=0x04c11db7, reflect_in=True, xor_in=0xffffffff,
+                       reflect_out=True, xor_out=0xffffffff)
+
+            out = run_pycrc(["--model", "crc-32", "--check-file", d, "--recursive", "--jobs", "2"])
+            names = ["a.txt", "b.bin", "sub/c.txt", "sub/sub/d.txt"]
+            assert out.splitlines() == [f"{algo.table_driven(files[n]):#010x}  {os.path.join(d, n)}" for n in names]
+
+            out = run_pycrc(["--model", "crc-32", "--check-file", os.path.join(d, "sub"), os.path.join(d, "a.txt"),
+                             "--recursive", "--include", "*.txt", "--exclude", "d*", "--manifest-format", "json"])
+            assert [json.loads(line) for line in out.splitlines()] == [
+                {"crc": f"{algo.table_driven(files[n]):#010x}", "file": os.path.join(d, n)} for n in ["sub/c.txt", "a.txt"]]
+
+            ret = subprocess.run(['python3', 'src/pycrc.py', "--model", "crc-32",
+                                  "--check-file", os.path.join(d, "missing"), os.path.join(d, "a.txt")],
+                                 capture_output=True)
+            assert ret.returncode == 1
+            assert ret.stdout.decode('utf-8') == f"0xcbf43926  {os.path.join(d, 'a.txt')}\n"
+
+    def test_verify(self):
+        with tempfile.TemporaryDirectory(prefix="pycrc-test.") as d:
+            files = os.path.join(d, "files")
+            os.mkdir(files)
+            names = [os.path.join(files, f"file{i:d}") for i in range(10)]
+            for i, name in enumerate(names):
+                with open(name, "wb") as f:
+                    f.write(bytes(range(i * 20)))
+            for fmt in ["text", "json"]:
+                manifest = os.path.join(d, f"manifest.{fmt}")
+                run_pycrc(["--model", "crc-16", "--check-file", files, "--manifest-format", fmt, "-o", manifest])
+                out = run_pycrc(["--model", "crc-16", "--verify", manifest, "--jobs", "3"]).splitlines()
+                assert out[:-1] == [f"{name}: OK" for name in names]
+                assert out[-1].startswith("10 files checked, 0 failed, ")
+
+            with open(names[3], "ab") as f:
+                f.write(b"x")
+            ret = subprocess.run(['python3', 'src/pycrc.py', "--model", "crc-16", "--verify", manifest], capture_output=True)
+            assert ret.returncode == 1
+            out = ret.stdout.decode('utf-8').splitlines()
+            assert out[3] == f"{names[3]}: FAILED"
+            assert out[-1].startswith("10 files checked, 1 failed, ")
+
+            ret = subprocess.run(['python3', 'src/pycrc.py', "--model", "crc-16", "--verify", manifest, "--fail-fast"],
+                                 capture_output=True)
+            assert ret.returncode == 1
+            assert ret.stdout.decode('utf-8').splitlines()[-1].startswith("4 files checked, 1 failed, ")
+
+    def test_batch(self):
+        with tempfile.TemporaryDirectory(prefix="pycrc-test.") as d:
+            os.mkdir(os.path.join(d, "single"))
+            os.mkdir(os.path.join(d, "batch"))
+            specs = [["--model", name, "--algorithm", "tbl", "--generate", gen]
+                     for name in ["crc-5", "crc-32", "xmodem"] for gen in ["h", "c"]]
+            spec_file = os.path.join(d, "spec")
+            with open(spec_file, "w") as f:
+                f.write("# comment\n\n")
+                for i, spec in enumerate(specs):
+                    run_pycrc(spec + ["-o", os.path.join(d, "single", f"out{i:d}")])
+                    f.write(" ".join(spec + ["-o", os.path.join(d, "batch", f"out{i:d}")]) + "\n")
+            for jobs in ["1", "2"]:
+                run_pycrc(["--batch", spec_file, "--jobs", jobs])
+                for i in range(len(specs)):
+                    assert read_code(os.path.join(d, "batch", f"out{i:d}")) == \
+                        read_code(os.path.join(d, "single", f"out{i:d}"))
+
+            with open(spec_file, "a") as f:
+                f.write("--model crc-32 --check-string 123\n")
+            ret = subprocess.run(['python3', 'src/pycrc.py', "--batch", spec_file], capture_output=True)
+            assert ret.returncode == 1
+            assert ret.stderr.decode('utf-8') == f"pycrc: error: {spec_file}:9: invalid batch line\n"
+
+    def test_cache_dir(self):
+        with tempfile.TemporaryDirectory(prefix="pycrc-test.") as d:
+            cache_dir = os.path.join(d, "cache")
+            gen_args = ["--model", "crc-32", "--algorithm", "tbl", "--no-timestamp", "--generate"]
+            run_pycrc(gen_args + ["c", "-o", os.path.join(d, "crc.c")])
+            with open(os.path.join(d, "crc.c")) as f:
+                expected = f.read()
+            for i in range(2):
+                out_file = os.path.join(d, f"out{i:d}", "crc.c")
+                os.mkdir(os.path.dirname(out_file))
+                run_pycrc(gen_args + ["c", "-o", out_file, "--cache-dir", cache_dir])
+                with open(out_file) as f:
+                    assert f.read() == expected
+                assert len(os.listdir(cache_dir)) == 1
+            assert run_pycrc(gen_args + ["h", "--cache-dir", cache_dir]) == run_pycrc(gen_args + ["h"])
+            assert len(os.listdir(cache_dir)) == 2
+
+            # The least recently used file is removed first.
+            sizes = {name: os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir)}
+            oldest, newest = sorted(sizes, key=sizes.get, reverse=True)
+            os.utime(os.path.join(cache_dir, oldest), (0, 0))
+            run_pycrc(gen_args + ["table", "--cache-dir", cache_dir, "--cache-size", str(sum(sizes.values()))])
+            assert newest in os.listdir(cache_dir) and oldest not in os.listdir(cache_dir)
+            assert len(os.listdir(cache_dir)) == 2
+
+            # The cache is not used for files with a timestamp, or if the directory can't be created.
+            ret = subprocess.run(['python3', 'src/pycrc.py', "--model", "crc-32", "--algorithm", "tbl", "--generate", "h",
+                                  "--cache-dir", os.path.join(d, "cache2")], capture_output=True)
+            assert b"--cache-dir requires --no-timestamp" in ret.stderr
+            assert not os.path.exists(os.path.join(d, "cache2"))
+            ret = subprocess.run(['python3', 'src/pycrc.py'] + gen_args +
+                                 ["c", "-o", os.path.join(d, "crc2.c"), "--cache-dir", os.path.join(d, "crc.c")],
+                                 capture_output=True)
+            assert ret.returncode == 0 and b"can't use the cache directory" in ret.stderr
+
+
+def read_code(filename):
+    """
+    Return the generated code in filename without the line with the timestamp.
+    """
+    with open(filename) as f:
+        return [line for line in f if "Generated on" not in line]
+
 
-def run_cmd(cmd):
+def run_cmd(cmd, input=None):
     LOGGER.info(' '.join(cmd))
-    ret = subprocess.run(cmd, check=True, capture_output=True)
+    ret = subprocess.run(cmd, check=True, capture_output=True, input=input)
     return ret
 
 
-def run_pycrc(args):
-    ret = run_cmd(['python3', 'src/pycrc.py'] + args)
+def run_pycrc(args, input=None):
+    ret = run_cmd(['python3', 'src/pycrc.py'] + args, input=input)
     return ret.stdout.decode('utf-8').rstrip()
 
 
-def check_crc(args, expected_crc):
-    res = run_pycrc(args)
+def check_crc(args, expected_crc, input=None):
+    res = run_pycrc(args, input=input)
     assert res[:2] == "0x"
     assert int(res, 16) == expected_crc
 
@@ -2,6 +2,7 @@
 
 import logging
 import os
+import shlex
 import tempfile
 import subprocess
 import itertools
@@ -55,6 +56,19 @@ class TestCodeGen:
 
     # --slice-by not supported with C89
 
+    @pytest.mark.skipif(not use_algo_table_driven, reason='tbl tests disabled')
+    def test_models_clmul_c99(self):
+        # The data must be at least 64 bytes long to be folded with carry-less multiplications.
+        check_str = 'The quick brown fox jumps over the lazy dog. ' * 4
+        compile_and_test_models('clmul', 'c99', check_str=check_str)
+
+    def test_combine_c99(self):
+        compile_and_test_combine('c99')
+
+    @pytest.mark.skipif(not use_c89, reason='c89 tests disabled')
+    def test_combine_c89(self):
+        compile_and_test_combine('c89')
+
     @pytest.mark.skipif(not use_algo_table_driven, reason="tbl tests disabled")
     def test_incomplete_models_tbl_c99(self):
         params = ['width', 'poly', 'xor_in', 'reflect_in', 'xor_out', 'reflect_out']
@@ -70,6 +84,13 @@ class TestCodeGen:
         compile_and_run_variable_width('bbf', 'c99')
         compile_and_run_variable_width('tbl', 'c99')
 
+    @pytest.mark.skipif(not use_algo_table_driven, reason='tbl tests disabled')
+    @pytest.mark.skipif(not use_algo_table_slice, reason='tbl slice tests disabled')
+    def test_variable_width_sb(self):
+        check_str = 'The quick brown fox jumps over the lazy dog. 0123456789'
+        compile_and_run_variable_width('tbl', 'c99', ['--slice-by', '4'], 'crc-64-jones', check_str)
+        compile_and_run_variable_width('tbl', 'c99', ['--slice-by', '16'], 'crc-32-mpeg', check_str)
+
 
 def run_cmd(cmd):
     LOGGER.info(' '.join(cmd))
@@ -92,23 +113,89 @@ def gen_src(tmpdir, args, name):
     run_pycrc(gen + args)
 
 
+def gen_src_batch(tmpdir, args_and_names, gen_types=['h', 'c-main']):
+    spec = os.path.join(tmpdir, 'batch.spec')
+    with open(spec, 'w') as f:
+        for args, name in args_and_names:
+            for gen_type in gen_types:
+                ext = 'h' if gen_type == 'h' else 'c'
+                f.write(shlex.join(['--generate', gen_type, '-o', os.path.join(tmpdir, f'{name}.{ext}')] + args) + '\n')
+    run_pycrc(['--batch', spec])
+
+
 def compile_and_run(tmpdir, compile_args, run_args, name, check):
     gen_src(tmpdir, compile_args, name)
+    run_compiled(tmpdir, run_args, name, check)
+
+
+def run_compiled(tmpdir, run_args, name, check):
     binary = os.path.join(tmpdir, 'a.out')
     compile_src(binary, os.path.join(tmpdir, name + '.c'))
     run_and_check_res([binary] + run_args, check)
 
 
-def compile_and_test_models(algo, cstd, opt_args=[]):
+def compile_and_test_models(algo, cstd, opt_args=[], check_str=None):
+    # Don't test width > 32 for C89, as I don't know how to ask for an data type > 32 bits.
+    models = [m for m in CrcModels().models if cstd != 'c89' or m['width'] <= 32]
     with tempfile.TemporaryDirectory(prefix='pycrc-test.') as tmpdir:
-        for m in CrcModels().models:
-            # Don't test width > 32 for C89, as I don't know how to ask for an data type > 32 bits.
-            if cstd == 'c89' and m['width'] > 32:
-                continue
-            args = args_from_model(m)
-            args += ['--algorithm', algo, '--std', cstd]
-            args += opt_args
-            compile_and_run(tmpdir, args, [], m['name'], m['check'])
+        gen_src_batch(tmpdir, [(args_from_model(m) + ['--algorithm', algo, '--std', cstd] + opt_args, m['name'])
+                               for m in models])
+        for m in models:
+            if check_str is None:
+                run_compiled(tmpdir, [], m['name'], m['check'])
+            else:
+                reference = Crc(width=m['width'], poly=m['poly'],
+                                reflect_in=m['reflect_in'], xor_in=m['xor_in'],
+                                reflect_out=m['reflect_out'], xor_out=m['xor_out'])
+                run_compiled(tmpdir, ['-s', check_str], m['name'], reference.table_driven(check_str))
+
+
+def compile_and_test_combine(cstd):
+    check_str = 'The quick brown fox jumps over the lazy dog.'
+    long_len = 123456789
+    models = CrcModels().models + [dict(CrcModels().get_params('crc-5'), name='crc-5-nonreflected', reflect_out=False)]
+    models = [m for m in models if cstd != 'c89' or m['width'] <= 32]
+    with tempfile.TemporaryDirectory(prefix='pycrc-test.') as tmpdir:
+        gen_src_batch(tmpdir, [(args_from_model(m) + ['--algorithm', 'tbl', '--std', cstd, '--combine'], m['name'])
+                               for m in models], ['h', 'c'])
+        for m in models:
+            reference = Crc(width=m['width'], poly=m['poly'],
+                            reflect_in=m['reflect_in'], xor_in=m['xor_in'],
+                            reflect_out=m['reflect_out'], xor_out=m['xor_out'])
+            crc = reference.table_driven(check_str)
+            # Combine the CRCs of all splits of the check string and compare with the CRC of the whole string.
+            main_c = os.path.join(tmpdir, 'main.c')
+            with open(main_c, 'w') as f:
+                f.write(f'''#include "{m['name']}.h"
+#include <stdlib.h>
+#include <string.h>
+
+int main(void)
+{{
+    static const char str[] = "{check_str}";
+    size_t len = strlen(str);
+    size_t split;
+    crc_t crc1, crc2;
+
+    if (crc_finalize(crc_update(crc_init(), str, len)) != {crc:#x}) {{
+        return EXIT_FAILURE;
+    }}
+    for (split = 0; split <= len; split++) {{
+        crc1 = crc_finalize(crc_update(crc_init(), str, split));
+        crc2 = crc_finalize(crc_update(crc_init(), str + split, len - split));
+        if (crc_combine(crc1, crc2, len - split) != {crc:#x}) {{
+            return EXIT_FAILURE;
+        }}
+    }}
+    if (crc_combine({crc:#x}, {crc:#x}, {long_len}) != {reference.combine(crc, crc, long_len):#x}) {{
+        return EXIT_FAILURE;
+    }}
+    return EXIT_SUCCESS;
+}}
+''')
+            binary = os.path.join(tmpdir, 'a.out')
+            compile_src(binary, [main_c, os.path.join(tmpdir, f'{m["name"]}.c')], cstd)
+            run_cmd([binary])
 
 
 def compile_and_test_incomplete_models(algo, cstd, erase_params=[]):
@@ -132,14 +219,20 @@ def compile_and_run_special_cases():
         compile_and_run(tmpdir, crc_5_args + ['--table-idx-width=8'], [], 'special', 0x01)
         compile_and_run(tmpdir, crc_5_args + ['--table-idx-width=4'], [], 'special', 0x01)
         compile_and_run(tmpdir, crc_5_args + ['--table-idx-width=2'], [], 'special', 0x01)
+        for name in ['crc-16', 'xmodem', 'crc-32', 'crc-64-jones']:
+            m = CrcModels().get_params(name)
+            idx16_args = args_from_model(m) + ['--algorithm', 'table-driven', '--table-idx-width=16']
+            compile_and_run(tmpdir, idx16_args, [], 'special', m['check'])
 
 
-def compile_and_run_variable_width(algo, cstd):
-    check_str = "123456789"
+def compile_and_run_variable_width(algo, cstd, opt_args=[], model='crc-64-jones', check_str='123456789'):
     models = CrcModels()
-    m = models.get_params('crc-64-jones')
+    m = models.get_params(model)
+    widths = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15, 16, 17, 23, 24, 25, 31, 32, 33, 63, 64]
+    args_and_names = []
+    checks = []
     with tempfile.TemporaryDirectory(prefix='pycrc-test.') as tmpdir:
-        for width in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15, 16, 17, 23, 24, 25, 31, 32, 33, 63, 64]:
+        for width in widths:
             mask = (1 << width) - 1
             mw = {
                     'width':            width,
@@ -160,8 +253,11 @@ def compile_and_run_variable_width(algo, cstd):
             reference = Crc(width=mw['width'], poly=mw['poly'],
                             reflect_in=mw['reflect_in'], xor_in=mw['xor_in'],
                             reflect_out=mw['reflect_out'], xor_out=mw['xor_out'])
-            check = reference.bit_by_bit_fast(check_str)
-            compile_and_run(tmpdir, ['--algorithm', algo, '--std', cstd] + args, [], 'var_width', check)
+            args_and_names.append((['--algorithm', algo, '--std', cstd] + args + opt_args, f'var_width_{width}'))
+            checks.append(reference.bit_by_bit_fast(check_str))
+        gen_src_batch(tmpdir, args_and_names)
+        for (args, name), check in zip(args_and_names, checks):
+            run_compiled(tmpdir, ['-s', check_str], name, check)
 
 
 def run_and_check_res(cmd, expected_crc):
@@ -170,8 +266,10 @@ def run_and_check_res(cmd, expected_crc):
     assert int(res, 16) == expected_crc
 
 
-def compile_src(out_file, src_file, cstd='c99'):
-    run_cmd(['cc', '-W', '-Wall', '-pedantic', '-Werror', f'-std={cstd}', '-o', out_file, src_file])
+def compile_src(out_file, src_files, cstd='c99'):
+    if isinstance(src_files, str):
+        src_files = [src_files]
+    run_cmd(['cc', '-W', '-Wall', '-pedantic', '-Werror', f'-std={cstd}', '-o', out_file] + src_files)
 
 
 def args_from_model(m):